@@ -64,6 +64,13 @@ async def startup_event():
         print(f"Warning: K-line collector failed to start: {e}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending alerts and close pooled SMTP connections on shutdown"""
+    from backend.services.notification_service import close_notifications
+    await close_notifications()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -9,7 +9,7 @@ from backend.services.binance_service import BinanceService
 from backend.services.screening_service import ScreeningService
 from backend.services.indicator_service import IndicatorService
 from backend.services.chart_service import ChartService
-from backend.services.notification_service import NotificationService
+from backend.services.notification_service import NotificationService, get_alert_batcher
 from backend.services.trading_service import TradingService
 from backend.services.sim_trading_service import SimTradingService
 
@@ -52,10 +52,9 @@ class WatchlistRequest(BaseModel):
 
 
 # Helper function to run async notifications in background
-async def send_screening_notification(results: List[dict], timeframe: str, db: Session):
-    """Background task to send notifications"""
-    notification_service = NotificationService(db)
-    await notification_service.send_screening_alert(
+async def send_screening_notification(results: List[dict], timeframe: str):
+    """Background task to send notifications (coalesced with other alerts in the same batch window)"""
+    await get_alert_batcher().submit(
         results=results,
         timeframe=timeframe,
         send_email=True,
@@ -113,8 +112,7 @@ async def screen_altcoins(
             background_tasks.add_task(
                 send_screening_notification,
                 results,
-                request.timeframe,
-                db
+                request.timeframe
             )
 
         return {
@@ -188,13 +186,7 @@ async def generate_chart(
         df = indicator_service.calculate_all_indicators(df)
 
         # Detect anomalies
-        anomaly_points = []
-        for i in range(len(df)):
-            if i > 0:
-                subset = df.iloc[:i+1]
-                is_anomaly, _ = indicator_service.detect_price_anomaly(subset)
-                if is_anomaly:
-                    anomaly_points.append(i)
+        anomaly_points = indicator_service.find_price_anomalies(df)
 
         # Generate chart
         chart_path = chart_service.create_kline_chart(
@@ -1571,7 +1563,7 @@ async def reset_daily_notification_count(
         settings = db.query(NotificationSettings).first()
         if settings:
             settings.daily_count = 0
-            settings.daily_count_reset_date = datetime.utcnow().strftime("%Y-%m-%d")
+            settings.daily_count_reset_date = datetime.utcnow().date()
             db.commit()
 
         return {"success": True, "message": "Daily count reset"}
@@ -1581,13 +1573,9 @@ async def reset_daily_notification_count(
 
 
 @router.post("/notification-settings/test")
-async def test_notification(
-    db: Session = Depends(get_db_session)
-):
+async def test_notification():
     """Send a test notification"""
     try:
-        notification_service = NotificationService(db)
-
         test_results = [{
             'symbol': 'TEST/USDT',
             'total_score': 85.0,
@@ -1602,11 +1590,13 @@ async def test_notification(
             'price_anomaly': False
         }]
 
-        success = await notification_service.send_screening_alert(
+        # 测试通知直接发送，不经过合并窗口，避免混入同一窗口内的真实告警
+        success = await NotificationService().send_screening_alert(
             results=test_results,
             timeframe='test',
             send_email=True,
-            send_telegram=True
+            send_telegram=True,
+            dedup=False  # 测试内容固定，不参与去重
         )
 
         return {
@@ -15,6 +15,11 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     EMAIL_TO: str = ""
+    SMTP_POOL_SIZE: int = 3
+    SMTP_MAX_MSGS_PER_CONN: int = 100
+    ALERT_BATCH_WINDOW_MS: int = 300
+    ALERT_BATCH_MAX: int = 8
+    ALERT_DEDUP_WINDOW_SEC: int = 300
 
     # Telegram
     TELEGRAM_BOT_TOKEN: str = ""
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 import os
@@ -16,6 +17,23 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
 
+if "sqlite" in settings.DATABASE_URL:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL 模式：读不阻塞写；synchronous=NORMAL 在 WAL 下仍保证一致性"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+        # 关闭 pysqlite 自身的事务处理，改由下方 begin 事件显式发出 BEGIN，
+        # 否则 SAVEPOINT 会被 SQLite 当作事务起点，RELEASE 时即提交
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _sqlite_begin(conn):
+        """Emit BEGIN ourselves so SAVEPOINTs nest inside the session transaction"""
+        conn.exec_driver_sql("BEGIN")
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -24,6 +42,11 @@ def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
 
+    # create_all 会跳过已存在的表，后续新增到旧表上的索引需单独创建
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
 
 @contextmanager
 def get_db() -> Session:
@@ -39,6 +62,36 @@ def get_db() -> Session:
         db.close()
 
 
+def warm_up_pool(target_engine: Engine = None, size: int = None) -> int:
+    """
+    Open pooled connections ahead of time so the first queries don't pay connect latency
+
+    Args:
+        target_engine: Engine to warm (defaults to the main engine)
+        size: Number of connections to open (defaults to the pool size)
+
+    Returns:
+        Number of connections opened
+    """
+    target_engine = target_engine or engine
+    if size is None:
+        pool_size = getattr(target_engine.pool, 'size', None)
+        size = pool_size() if callable(pool_size) else 1
+
+    # Hold all connections at once so the pool creates `size` distinct ones
+    connections = []
+    try:
+        for _ in range(size):
+            conn = target_engine.connect()
+            connections.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            conn.close()
+
+    return len(connections)
+
+
 def get_db_session() -> Session:
     """Get database session (for FastAPI dependency)"""
     db = SessionLocal()
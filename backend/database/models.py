@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Index
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -116,6 +116,8 @@ class ScreeningResult(Base):
 
     __table_args__ = (
         Index('idx_screen_timestamp', 'timestamp', 'total_score'),
+        Index('idx_screen_symbol_timestamp', 'symbol', 'timestamp'),
+        Index('idx_screen_score_timestamp', 'total_score', 'timestamp'),
     )
 
 
@@ -358,6 +360,7 @@ class SimPosition(Base):
 
     __table_args__ = (
         Index('idx_simposition_account_symbol', 'account_id', 'symbol', 'is_closed'),
+        Index('idx_simposition_account_open_entry', 'account_id', 'is_closed', 'entry_time'),
     )
 
 
@@ -420,7 +423,7 @@ class NotificationSettings(Base):
     # 每日通知限制
     daily_limit = Column(Integer, default=10)  # 每天最多发送次数
     daily_count = Column(Integer, default=0)  # 今日已发送次数
-    daily_count_reset_date = Column(String)  # 重置日期 (YYYY-MM-DD)
+    daily_count_reset_date = Column(Date)  # 重置日期（北京时间）
 
     # 通知内容设置
     min_score_threshold = Column(Float, default=75.0)  # 最低分数阈值
@@ -25,7 +25,9 @@ engine = create_engine(
     pool_size=5,
     max_overflow=10,
     pool_pre_ping=True,
-    pool_recycle=3600
+    pool_recycle=3600,
+    # Short OLTP-style queries: JIT compilation only adds first-query latency
+    connect_args={"options": "-c jit=off"}
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,10 +1,17 @@
 import ccxt
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import threading
 import time
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
 from backend.config import settings
+from backend.utils.rate_limiter import TokenBucket
 
 # Try to import TimescaleDB functions (optional)
 try:
@@ -13,6 +20,52 @@ try:
 except ImportError:
     TIMESCALE_AVAILABLE = False
 
+# orjson parses the large ticker payloads several times faster than json (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+
+def _json_loads(data: bytes):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _run_async(coro):
+    """Run a coroutine to completion from sync code
+
+    Uses asyncio.run directly, or a helper thread when the calling thread
+    already runs an event loop (e.g. a sync call made from an async route).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def _ohlcv_to_df(rows: list, symbol: str, timeframe: str) -> pd.DataFrame:
+    """Build the OHLCV DataFrame from kline rows [timestamp_ms, open, high, low, close, volume, ...]"""
+    # 一次性转换为 float64 二维数组，按列构建 DataFrame（避免逐列类型推断和转换）
+    values = np.array([row[:6] for row in rows], dtype=np.float64).reshape(-1, 6)
+    opens, highs, lows, closes, volumes = values[:, 1], values[:, 2], values[:, 3], values[:, 4], values[:, 5]
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(values[:, 0].astype(np.int64), unit='ms'),
+        'open': opens,
+        'high': highs,
+        'low': lows,
+        'close': closes,
+        'volume': volumes,
+        # Calculate quote volume (volume in quote currency, e.g., USDT)
+        # Use average price (OHLC/4) * volume as approximation
+        'quote_volume': ((opens + highs + lows + closes) / 4) * volumes,
+        'symbol': symbol,
+        'timeframe': timeframe,
+    })
+
 
 # Global cache for market data to prevent rate limiting
 _market_cache = {
@@ -27,7 +80,48 @@ _market_cache = {
 _CACHE_TTL = 30  # Cache TTL in seconds for prices
 _SYMBOLS_CACHE_TTL = 300  # Cache symbols for 5 minutes
 _TICKERS_CACHE_TTL = 60  # Cache tickers for 1 minute
+_TICKER_CACHE_TTL = 45  # Cache raw 24h tickers for 45 seconds
+_SENTIMENT_CACHE_TTL = 600  # Fear & Greed / Altcoin Season indices change slowly
 _API_DELAY = 0.1  # Delay between API calls in seconds
+_TICKER_24HR_URL = 'https://api.binance.com/api/v3/ticker/24hr'
+_KLINES_URL = 'https://api.binance.com/api/v3/klines'
+OHLCV_MAX_CONNECTIONS = 50  # 异步K线请求的连接池大小
+
+# 按 key 缓存的短时结果：(写入时间, 值)
+_ttl_cache: Dict[tuple, tuple] = {}
+_ttl_cache_lock = threading.Lock()
+
+
+def _ttl_cached(key: tuple, ttl: float, loader, cache_if=bool):
+    """
+    Return the cached value for `key` if younger than `ttl` seconds, else call `loader`
+
+    Results for which `cache_if(value)` is false (errors, empty data) are not
+    cached, so the next call retries the API.
+    """
+    now = time.time()
+    with _ttl_cache_lock:
+        entry = _ttl_cache.get(key)
+    if entry and now - entry[0] < ttl:
+        return entry[1]
+
+    value = loader()
+    if cache_if(value):
+        with _ttl_cache_lock:
+            _ttl_cache[key] = (now, value)
+    return value
+
+
+# Binance REST 请求权重限制（每分钟 1200，留出余量）
+# 令牌桶容量 + 每分钟补充量 = 任意一分钟内的上限，两者各占一半
+_WEIGHT_PER_MINUTE = 1150
+_KLINES_WEIGHT = 2
+_TICKER_24HR_WEIGHT = 80
+_request_weight = TokenBucket(rate=_WEIGHT_PER_MINUTE / 2 / 60, capacity=_WEIGHT_PER_MINUTE / 2)
+
+# 直连 Binance REST 的共享会话：保持 keep-alive，避免每次请求重新握手 TCP/TLS
+_http_session = requests.Session()
+_http_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
 
 
 class BinanceService:
@@ -147,20 +241,14 @@ class BinanceService:
             DataFrame with OHLCV data
         """
         try:
-            time.sleep(_API_DELAY)  # Rate limiting delay
-            # 使用公开客户端获取K线数据（不需要API密钥）
-            ohlcv = self.public_exchange.fetch_ohlcv(symbol, timeframe, since, limit)
-            df = pd.DataFrame(
-                ohlcv,
-                columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-            )
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            # Calculate quote volume (volume in quote currency, e.g., USDT)
-            # Use average price (OHLC/4) * volume as approximation
-            df['quote_volume'] = ((df['open'] + df['high'] + df['low'] + df['close']) / 4) * df['volume']
-            df['symbol'] = symbol
-            df['timeframe'] = timeframe
-            return df
+            _request_weight.acquire(_KLINES_WEIGHT)
+            # 直接请求公开K线接口（不需要API密钥），复用连接池
+            params = {'symbol': self.market_ids([symbol])[symbol], 'interval': timeframe, 'limit': limit}
+            if since is not None:
+                params['startTime'] = since
+            response = _http_session.get(_KLINES_URL, params=params, timeout=10)
+            response.raise_for_status()
+            return _ohlcv_to_df(_json_loads(response.content), symbol, timeframe)
         except Exception as e:
             print(f"Error fetching OHLCV for {symbol}: {e}")
             return pd.DataFrame()
@@ -176,22 +264,111 @@ class BinanceService:
         For 15m/1h/4h/1d, uses aggregated 5m data from database
         """
         # Try database first for aggregated data
+        df = self._fetch_ohlcv_from_db(symbol, timeframe, limit)
+        if df is not None:
+            return df
+
+        # Fallback to API
+        return self.fetch_ohlcv(symbol, timeframe, limit)
+
+    def _fetch_ohlcv_from_db(self, symbol: str, timeframe: str, limit: int) -> Optional[pd.DataFrame]:
+        """Aggregated OHLCV from TimescaleDB for non-5m timeframes, or None if unavailable"""
+        if not TIMESCALE_AVAILABLE or timeframe == '5m':
+            return None
+        try:
+            if has_sufficient_data(symbol, min_candles=50):
+                klines = get_aggregated_klines(symbol, timeframe, limit)
+                if klines:
+                    df = pd.DataFrame(klines).rename(columns={'time': 'timestamp'})
+                    # 与API路径一致：无时区的 UTC 时间，按时间升序
+                    df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True).dt.tz_localize(None)
+                    df = df.sort_values('timestamp', ignore_index=True)
+                    df['symbol'] = symbol
+                    df['timeframe'] = timeframe
+                    return df[['timestamp', 'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'symbol', 'timeframe']]
+        except Exception as e:
+            print(f"Database fetch failed for {symbol}, falling back to API: {e}")
+        return None
+
+    async def _fetch_ohlcv_async(
+        self,
+        session: aiohttp.ClientSession,
+        market_id: str,
+        symbol: str,
+        timeframe: str,
+        limit: int
+    ) -> pd.DataFrame:
+        """Async counterpart of fetch_ohlcv_smart using a shared aiohttp session"""
         if TIMESCALE_AVAILABLE and timeframe != '5m':
+            df = await asyncio.to_thread(self._fetch_ohlcv_from_db, symbol, timeframe, limit)
+            if df is not None:
+                return df
+
+        await _request_weight.acquire_async(_KLINES_WEIGHT)
+        params = {'symbol': market_id, 'interval': timeframe, 'limit': limit}
+        async with session.get(_KLINES_URL, params=params) as response:
+            response.raise_for_status()
+            rows = _json_loads(await response.read())
+        return _ohlcv_to_df(rows, symbol, timeframe)
+
+    async def fetch_ohlcv_multi_async(
+        self,
+        jobs: List[Tuple[str, str, int]],
+        max_connections: int = OHLCV_MAX_CONNECTIONS,
+        timeout: Optional[float] = None
+    ) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        Fetch many OHLCV series concurrently over one connection pool
+
+        Requests are paced only by the shared Binance request-weight bucket.
+
+        Args:
+            jobs: (symbol, timeframe, limit) tuples
+            max_connections: Connection pool size
+            timeout: Overall time budget in seconds; unfinished requests are cancelled
+
+        Returns:
+            Dict mapping (symbol, timeframe) to a DataFrame (empty on error);
+            requests cut off by the timeout are absent
+        """
+        ids = self.market_ids(list({symbol for symbol, _, _ in jobs}))
+        results: Dict[Tuple[str, str], pd.DataFrame] = {}
+
+        total_weight = _KLINES_WEIGHT * len(jobs)
+        print(f"Fetching {len(jobs)} OHLCV series ({total_weight} weight), "
+              f"predicted {_request_weight.time_until_available(total_weight):.1f}s under the rate limit")
+
+        async def fetch_one(session, symbol, timeframe, limit):
             try:
-                if has_sufficient_data(symbol, min_candles=50):
-                    klines = get_aggregated_klines(symbol, timeframe, limit)
-                    if klines:
-                        df = pd.DataFrame(klines)
-                        df['timestamp'] = pd.to_datetime(df['time'])
-                        df = df.rename(columns={'time': 'timestamp'})
-                        df['symbol'] = symbol
-                        df['timeframe'] = timeframe
-                        return df[['timestamp', 'open', 'high', 'low', 'close', 'volume', 'quote_volume', 'symbol', 'timeframe']]
+                results[(symbol, timeframe)] = await self._fetch_ohlcv_async(
+                    session, ids[symbol], symbol, timeframe, limit
+                )
             except Exception as e:
-                print(f"Database fetch failed for {symbol}, falling back to API: {e}")
-        
-        # Fallback to API
-        return self.fetch_ohlcv(symbol, timeframe, limit)
+                print(f"Error fetching OHLCV for {symbol}: {e}")
+                results[(symbol, timeframe)] = pd.DataFrame()
+
+        connector = aiohttp.TCPConnector(limit=max_connections)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=15)
+        ) as session:
+            tasks = [asyncio.create_task(fetch_one(session, *job)) for job in jobs]
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=timeout)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        return results
+
+    def fetch_ohlcv_multi(
+        self,
+        jobs: List[Tuple[str, str, int]],
+        max_connections: int = OHLCV_MAX_CONNECTIONS,
+        timeout: Optional[float] = None
+    ) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """Sync wrapper around fetch_ohlcv_multi_async"""
+        return _run_async(self.fetch_ohlcv_multi_async(jobs, max_connections, timeout))
 
     def fetch_ticker(self, symbol: str) -> Dict:
         """Fetch current ticker data"""
@@ -203,6 +380,52 @@ class BinanceService:
             print(f"Error fetching ticker for {symbol}: {e}")
             return {}
 
+    def fetch_tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Fetch current tickers for several symbols with a single REST call"""
+        if not symbols:
+            return {}
+        try:
+            return self.public_exchange.fetch_tickers(symbols)
+        except Exception as e:
+            print(f"Error fetching tickers for {len(symbols)} symbols: {e}")
+            return {}
+
+    def fetch_all_tickers_raw(self) -> pd.DataFrame:
+        """
+        Fetch 24h tickers for every symbol with a single REST call
+
+        Bypasses ccxt's per-ticker parsing: the raw JSON is loaded straight
+        into a DataFrame with numeric columns. Cached for _TICKER_CACHE_TTL
+        seconds, so concurrent screening jobs share one request.
+
+        Returns:
+            DataFrame with columns symbol (exchange id, e.g. 'ETHBTC'),
+            lastPrice, priceChangePercent, quoteVolume
+        """
+        return _ttl_cached(
+            ('tickers_raw',), _TICKER_CACHE_TTL, self._fetch_all_tickers_raw,
+            cache_if=lambda df: not df.empty
+        )
+
+    def _fetch_all_tickers_raw(self) -> pd.DataFrame:
+        _request_weight.acquire(_TICKER_24HR_WEIGHT)
+        response = _http_session.get(_TICKER_24HR_URL, timeout=10)
+        response.raise_for_status()
+        data = _json_loads(response.content)
+
+        df = pd.DataFrame(data, columns=['symbol', 'lastPrice', 'priceChangePercent', 'quoteVolume'])
+        for col in ('lastPrice', 'priceChangePercent', 'quoteVolume'):
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+        return df
+
+    def market_ids(self, symbols: List[str]) -> Dict[str, str]:
+        """Map unified symbols (e.g. 'ETH/USDT') to Binance market ids (e.g. 'ETHUSDT')"""
+        markets = self.public_exchange.markets or {}
+        return {
+            symbol: markets[symbol]['id'] if symbol in markets else symbol.replace('/', '')
+            for symbol in symbols
+        }
+
     def fetch_24h_tickers(self) -> Dict[str, Dict]:
         """Fetch 24h ticker data for all symbols (with caching)"""
         global _market_cache
@@ -357,6 +580,13 @@ class BinanceService:
         }
 
     def _get_fear_greed_index(self) -> Dict:
+        """Get Fear & Greed Index (cached for _SENTIMENT_CACHE_TTL seconds)"""
+        return _ttl_cached(
+            ('fear_greed',), _SENTIMENT_CACHE_TTL, self._fetch_fear_greed_index,
+            cache_if=lambda result: result.get('value', 0) > 0
+        )
+
+    def _fetch_fear_greed_index(self) -> Dict:
         """Get CMC Crypto Fear & Greed Index by scraping CoinMarketCap page"""
         try:
             import requests
@@ -443,6 +673,13 @@ class BinanceService:
         return {'value': 0, 'label': 'N/A'}
 
     def _get_altcoin_season_index(self) -> Dict:
+        """Get Altcoin Season Index (cached for _SENTIMENT_CACHE_TTL seconds)"""
+        return _ttl_cached(
+            ('altcoin_season',), _SENTIMENT_CACHE_TTL, self._fetch_altcoin_season_index,
+            cache_if=lambda result: result.get('value', 0) > 0
+        )
+
+    def _fetch_altcoin_season_index(self) -> Dict:
         """Get CMC Altcoin Season Index by scraping CoinMarketCap page"""
         try:
             import requests
@@ -1,6 +1,19 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, List, NamedTuple, Tuple
+
+# 只读取最后一行时所需的K线数：SMA200 需要200根，EMA/MACD 初值影响经100根后已可忽略
+INDICATOR_WARMUP_ROWS = 300
+
+
+class IndicatorResult(NamedTuple):
+    """Last-row indicator readout used for screening"""
+    close_last: float
+    volume_surge_last: bool
+    above_sma: bool
+    macd_golden: bool
+    above_all_ema: bool
+    technical_score: float
 
 
 class IndicatorService:
@@ -143,11 +156,20 @@ class IndicatorService:
         return atr_value, atr_pct
 
     @staticmethod
-    def calculate_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate all technical indicators"""
+    def calculate_all_indicators(df: pd.DataFrame, min_rows: int = None) -> pd.DataFrame:
+        """Calculate all technical indicators
+
+        Args:
+            min_rows: Only compute over the last `min_rows` candles (e.g.
+                INDICATOR_WARMUP_ROWS) when just the latest values are needed;
+                the returned DataFrame is then that tail.
+        """
         if df.empty or len(df) < 200:
             return df
 
+        if min_rows and len(df) > min_rows:
+            df = df.iloc[-min_rows:].copy()
+
         df = IndicatorService.calculate_moving_averages(df)
         df = IndicatorService.calculate_macd(df)
         df = IndicatorService.calculate_rsi(df)
@@ -157,6 +179,42 @@ class IndicatorService:
 
         return df
 
+    @staticmethod
+    def summarize_last(df: pd.DataFrame) -> IndicatorResult:
+        """
+        Read the last-row indicator values once
+
+        Applies the same rules as check_price_above_sma, check_macd_golden_cross,
+        check_price_above_all_ema and calculate_technical_score, without each
+        of them re-reading the last row.
+        """
+        if df.empty:
+            return IndicatorResult(0.0, False, False, False, False, 0)
+
+        columns = df.columns
+        latest = df.iloc[-1]
+        close = latest['close']
+
+        def is_above(col: str) -> bool:
+            return col in columns and pd.notna(latest[col]) and close > latest[col]
+
+        above_sma = is_above('sma_20')
+        above_all_ema = all(is_above(col) for col in ('ema_7', 'ema_14', 'ema_30', 'ema_52'))
+        macd_golden = 'macd_golden_cross' in columns and bool(df['macd_golden_cross'].iloc[-3:].any())
+        volume_surge = 'volume_surge' in columns and bool(latest['volume_surge'])
+        rsi_healthy = 'rsi' in columns and pd.notna(latest['rsi']) and 40 <= latest['rsi'] <= 70
+
+        technical_score = 20 * (above_sma + macd_golden + above_all_ema + rsi_healthy + volume_surge)
+
+        return IndicatorResult(
+            close_last=float(close),
+            volume_surge_last=volume_surge,
+            above_sma=bool(above_sma),
+            macd_golden=macd_golden,
+            above_all_ema=above_all_ema,
+            technical_score=technical_score,
+        )
+
     @staticmethod
     def check_price_above_sma(df: pd.DataFrame) -> bool:
         """Check if price is above SMA 20"""
@@ -220,6 +278,27 @@ class IndicatorService:
 
         return is_anomaly, price_change_pct
 
+    @staticmethod
+    def detect_price_anomaly_scalar(closes: np.ndarray, threshold: float = 2.0) -> bool:
+        """Same check as detect_price_anomaly on a close-price array, returning only the flag"""
+        if len(closes) < 2:
+            return False
+        return bool(abs((closes[-1] - closes[-2]) / closes[-2] * 100) >= threshold)
+
+    @staticmethod
+    def find_price_anomalies(df: pd.DataFrame, threshold: float = 2.0) -> List[int]:
+        """
+        Row positions where detect_price_anomaly would fire on df[:i + 1]
+
+        Computes all candle-to-candle changes in one vectorized pass.
+        """
+        if df.empty or len(df) < 2:
+            return []
+
+        closes = df['close'].to_numpy(dtype=np.float64)
+        change_pct = np.diff(closes) / closes[:-1] * 100
+        return (np.flatnonzero(np.abs(change_pct) >= threshold) + 1).tolist()
+
     @staticmethod
     def calculate_price_changes(df: pd.DataFrame) -> Dict[str, float]:
         """Calculate price changes for different periods"""
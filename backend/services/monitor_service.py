@@ -1,20 +1,53 @@
 import asyncio
-import schedule
+import bisect
+import functools
+import heapq
+import itertools
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 from typing import Dict, List, Optional
+from sqlalchemy import select, update, case, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-import pytz
+from zoneinfo import ZoneInfo
 
-from backend.database.database import get_db
+from backend.database.database import get_db, warm_up_pool
 from backend.database.models import NotificationSettings
+from backend.services.binance_service import BinanceService
 from backend.services.screening_service import ScreeningService
-from backend.services.notification_service import NotificationService
+from backend.services.notification_service import close_notifications, get_alert_batcher
 from backend.services.sim_trading_service import SimTradingService
 from backend.config import settings
+from backend.utils.rate_limiter import TokenBucket
 # K-line collector now runs as continuous background thread in backend
 from datetime import timedelta
 
+# uvloop is optional (installed with uvicorn[standard] on Linux)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+BEIJING_TZ = ZoneInfo('Asia/Shanghai')
+
+# 优选时段判断结果缓存时长（秒）
+WINDOW_CACHE_TTL = 30
+
+# 并发执行自动交易检查的账户数上限（同时也限制了占用的数据库连接数）
+AUTO_TRADE_CONCURRENCY = 4
+
+# 数据清理间隔（秒）
+CLEANUP_INTERVAL = 10 * 86400
+
+
+@functools.lru_cache(maxsize=None)
+def _minutes_of(hour: int, minute: int) -> int:
+    """将时:分转换为当天的分钟数"""
+    return hour * 60 + minute
+
 
 class MonitorService:
     """Service for continuous monitoring and alerts"""
@@ -22,70 +55,123 @@ class MonitorService:
     def __init__(self):
         self.is_running = False
         self.screening_interval = settings.UPDATE_INTERVAL  # seconds
-        self.beijing_tz = pytz.timezone('Asia/Shanghai')
 
         # 优选交易时间段（北京时间）- 这些时段会获得额外权重加成，但不强制限制
         # 格式: [(开始小时, 开始分钟, 结束小时, 结束分钟), ...]
-        self.trading_windows = [
+        self._set_trading_windows([
             (7, 30, 8, 30),    # 7:30-8:30
             (11, 30, 12, 30),  # 11:30-12:30
             (15, 30, 16, 30),  # 15:30-16:30
-        ]
+        ])
+        self.trading_windows_enabled = True  # 关闭后不再给予优选时段加分
         self.trading_window_bonus = 5.0  # 优选时段额外加分
 
+        # 跨周期共享的 Binance 客户端（保留 ccxt 市场数据等）；服务实例按调用创建，各自持有会话
+        self.binance = BinanceService()
+
+        # 本进程内的通知限流器：间隔未到时无需访问数据库
+        self._notify_bucket: Optional[TokenBucket] = None
+        self._notify_bucket_interval: Optional[int] = None
+
+    def _set_trading_windows(self, trading_windows: List[tuple]):
+        """设置交易窗口，并预计算按开始时间排序的分钟区间 (start, end)"""
+        self.trading_windows = trading_windows
+        self._windows_minutes = sorted(
+            (_minutes_of(sh, sm), _minutes_of(eh, em))
+            for sh, sm, eh, em in trading_windows
+        )
+        self._window_starts = [start for start, _ in self._windows_minutes]
+        self._window_start_strs = [f"{start // 60:02d}:{start % 60:02d}" for start in self._window_starts]
+        self._window_cache = (None, None)  # (time bucket, in_window)
+
     def is_in_trading_window(self) -> bool:
-        """检查当前北京时间是否在优选交易时间窗口内（用于加分，不是限制）"""
-        now = datetime.now(self.beijing_tz)
-        current_minutes = now.hour * 60 + now.minute
+        """检查当前北京时间是否在优选交易时间窗口内（用于加分，不是限制）
 
-        for start_hour, start_min, end_hour, end_min in self.trading_windows:
-            start_minutes = start_hour * 60 + start_min
-            end_minutes = end_hour * 60 + end_min
+        结果按 WINDOW_CACHE_TTL 秒分桶缓存，同一筛选周期内多次调用不重复计算时区
+        """
+        bucket = int(time.monotonic() // WINDOW_CACHE_TTL)
+        if self._window_cache[0] == bucket:
+            return self._window_cache[1]
+
+        now = datetime.now(BEIJING_TZ)
+        current_minutes = _minutes_of(now.hour, now.minute)
 
+        in_window = False
+        for start_minutes, end_minutes in self._windows_minutes:
             if start_minutes <= current_minutes <= end_minutes:
-                return True
+                in_window = True
+                break
 
-        return False
+        self._window_cache = (bucket, in_window)
+        return in_window
 
     def get_time_window_bonus(self) -> float:
-        """获取当前时间窗口的加分值"""
-        if self.is_in_trading_window():
-            return self.trading_window_bonus
-        return 0.0
+        """获取当前时间窗口的加分值（未启用优选时段或不在时段内时为 0，复用 is_in_trading_window 的缓存）"""
+        if not self.trading_windows_enabled:
+            return 0.0
+        return self.trading_window_bonus if self.is_in_trading_window() else 0.0
 
     def get_next_trading_window(self) -> Optional[str]:
         """获取下一个交易时间窗口"""
-        now = datetime.now(self.beijing_tz)
-        current_minutes = now.hour * 60 + now.minute
+        if not self._window_starts:
+            return None
 
-        for start_hour, start_min, end_hour, end_min in self.trading_windows:
-            start_minutes = start_hour * 60 + start_min
+        now = datetime.now(BEIJING_TZ)
+        current_minutes = _minutes_of(now.hour, now.minute)
 
-            if current_minutes < start_minutes:
-                return f"{start_hour:02d}:{start_min:02d}"
+        idx = bisect.bisect_right(self._window_starts, current_minutes)
+        if idx < len(self._window_start_strs):
+            return self._window_start_strs[idx]
 
         # 如果当天所有窗口都过了，返回明天第一个窗口
-        start_hour, start_min, _, _ = self.trading_windows[0]
-        return f"明天 {start_hour:02d}:{start_min:02d}"
+        return f"明天 {self._window_start_strs[0]}"
 
     def _get_notification_settings(self, db: Session) -> NotificationSettings:
-        """获取通知设置，如果不存在则创建默认设置"""
-        ns = db.query(NotificationSettings).first()
-        if not ns:
-            ns = NotificationSettings()
-            db.add(ns)
-            db.commit()
-            db.refresh(ns)
+        """获取通知设置，如果不存在则创建默认设置
+
+        常规情况下只有一次 SELECT；首次创建使用 INSERT ... ON CONFLICT DO NOTHING RETURNING，
+        多个进程同时初始化也只会生成一行
+        """
+        ns = db.execute(
+            select(NotificationSettings).order_by(NotificationSettings.id).limit(1)
+        ).scalar_one_or_none()
+        if ns is not None:
+            return ns
+
+        insert = pg_insert if db.get_bind().dialect.name == 'postgresql' else sqlite_insert
+        stmt = (
+            insert(NotificationSettings)
+            .values(id=1)
+            .on_conflict_do_nothing(index_elements=['id'])
+            .returning(NotificationSettings)
+        )
+        ns = db.execute(stmt).scalar_one_or_none()
+        db.commit()
+        if ns is None:
+            # 其他进程已抢先创建
+            ns = db.execute(
+                select(NotificationSettings).where(NotificationSettings.id == 1)
+            ).scalar_one()
         return ns
 
+    def _get_notify_bucket(self, min_interval_minutes: int) -> Optional[TokenBucket]:
+        """获取与最小通知间隔匹配的令牌桶（间隔设置变化时重建）"""
+        if not min_interval_minutes or min_interval_minutes <= 0:
+            return None
+
+        if self._notify_bucket is None or self._notify_bucket_interval != min_interval_minutes:
+            self._notify_bucket = TokenBucket(rate=1.0 / (min_interval_minutes * 60), capacity=1)
+            self._notify_bucket_interval = min_interval_minutes
+        return self._notify_bucket
+
     def _can_send_notification(self, db: Session, ns: NotificationSettings) -> tuple:
         """
-        检查是否可以发送通知
+        检查是否可以发送通知，可以发送时已原子地占用本次通知额度
 
         Returns:
             (can_send, reason)
         """
-        beijing_now = datetime.now(self.beijing_tz)
+        beijing_now = datetime.now(BEIJING_TZ)
         current_hour = beijing_now.hour
 
         # 检查静默时段
@@ -99,102 +185,208 @@ class MonitorService:
                 if ns.quiet_hours_start <= current_hour < ns.quiet_hours_end:
                     return False, f"静默时段 ({ns.quiet_hours_start}:00-{ns.quiet_hours_end}:00)"
 
+        # 本地令牌桶预检查：最小间隔未到时直接跳过，不访问数据库
+        bucket = self._get_notify_bucket(ns.min_interval_minutes)
+        if bucket:
+            wait_seconds = bucket.time_until_available()
+            if wait_seconds > 0:
+                return False, f"距上次通知不足 {ns.min_interval_minutes} 分钟 (还需 {int(wait_seconds / 60)} 分钟)"
+
+        today = beijing_now.date()
+
+        # 记录更新前的状态，仅用于生成跳过原因
+        is_new_day = ns.daily_count_reset_date != today
+        daily_count = 0 if is_new_day else (ns.daily_count or 0)
+        last_time = ns.last_notification_time
+
+        consumed_count = self._atomic_consume_notification_budget(db, ns.id, today)
+        if consumed_count is not None:
+            if bucket:
+                bucket.try_acquire()
+            return True, f"今日第 {consumed_count} 次"
+
         # 检查每日限制
-        today_str = beijing_now.strftime("%Y-%m-%d")
-        if ns.daily_count_reset_date != today_str:
-            # 新的一天，重置计数
-            ns.daily_count = 0
-            ns.daily_count_reset_date = today_str
-            db.commit()
-
-        if ns.daily_count >= ns.daily_limit:
+        if daily_count >= ns.daily_limit:
             return False, f"达到每日限制 ({ns.daily_limit}次)"
 
         # 检查最小间隔
-        if ns.last_notification_time:
-            time_since_last = datetime.utcnow() - ns.last_notification_time
+        if last_time:
             min_interval = timedelta(minutes=ns.min_interval_minutes)
-            if time_since_last < min_interval:
-                remaining = min_interval - time_since_last
+            remaining = min_interval - (datetime.utcnow() - last_time)
+            if remaining > timedelta(0):
                 return False, f"距上次通知不足 {ns.min_interval_minutes} 分钟 (还需 {int(remaining.total_seconds() / 60)} 分钟)"
 
-        return True, "可以发送"
+        return False, "通知额度已被其他进程占用"
+
+    def _atomic_consume_notification_budget(
+        self,
+        db: Session,
+        ns_id: int,
+        today: date
+    ) -> Optional[int]:
+        """
+        原子地占用一次通知额度
+
+        单条 UPDATE ... RETURNING 完成跨日重置、每日限制、最小间隔检查和计数递增，
+        多个监控进程并发时不会重复占用额度。当前时间和间隔计算都在数据库端完成。
+
+        Returns:
+            占用后的今日通知次数；额度不足或间隔未到时返回 None
+        """
+        db_now, interval_cutoff = self._db_now_and_interval_cutoff(db)
+        is_new_day = NotificationSettings.daily_count_reset_date.is_distinct_from(today)
+        stmt = (
+            update(NotificationSettings)
+            .where(
+                NotificationSettings.id == ns_id,
+                or_(is_new_day, NotificationSettings.daily_count < NotificationSettings.daily_limit),
+                or_(
+                    NotificationSettings.last_notification_time.is_(None),
+                    NotificationSettings.last_notification_time <= interval_cutoff
+                )
+            )
+            .values(
+                daily_count=case((is_new_day, 1), else_=NotificationSettings.daily_count + 1),
+                daily_count_reset_date=today,
+                last_notification_time=db_now
+            )
+            .returning(NotificationSettings.daily_count)
+            .execution_options(synchronize_session=False)
+        )
+        consumed_count = db.execute(stmt).scalar_one_or_none()
+        db.commit()
+        return consumed_count
+
+    def _release_notification_budget(
+        self,
+        db: Session,
+        ns_id: int,
+        previous_notification_time: Optional[datetime]
+    ):
+        """
+        归还 _atomic_consume_notification_budget 占用的一次额度（通知未实际发送时调用）
 
-    def _update_notification_stats(self, db: Session, ns: NotificationSettings):
-        """更新通知统计"""
-        ns.last_notification_time = datetime.utcnow()
-        ns.daily_count += 1
+        今日计数减一，上次通知时间恢复为占用前的值，本地令牌桶同时重置
+        """
+        db.execute(
+            update(NotificationSettings)
+            .where(
+                NotificationSettings.id == ns_id,
+                NotificationSettings.daily_count > 0
+            )
+            .values(
+                daily_count=NotificationSettings.daily_count - 1,
+                last_notification_time=previous_notification_time
+            )
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
+        self._notify_bucket = None
+
+    @staticmethod
+    def _db_now_and_interval_cutoff(db: Session) -> tuple:
+        """
+        数据库端的当前 UTC 时间，以及 "当前时间 - min_interval_minutes" 的截止时间表达式
+
+        last_notification_time 以不带时区的 UTC 时间存储
+        """
+        min_interval = NotificationSettings.min_interval_minutes
+        if db.get_bind().dialect.name == 'postgresql':
+            db_now = func.timezone('UTC', func.now())
+            cutoff = db_now - func.make_interval(0, 0, 0, 0, 0, min_interval)
+        else:
+            db_now = func.datetime('now')
+            cutoff = func.datetime('now', func.printf('-%d minutes', min_interval))
+        return db_now, cutoff
 
     async def run_screening_job(self, timeframes: List[str] = None):
         """Run screening job for specified timeframes"""
         if timeframes is None:
             timeframes = ['5m', '15m', '1h']
 
-        beijing_now = datetime.now(self.beijing_tz)
+        beijing_now = datetime.now(BEIJING_TZ)
         in_window = self.is_in_trading_window()
 
         time_bonus = self.get_time_window_bonus()
         print(f"[{beijing_now.strftime('%Y-%m-%d %H:%M:%S')} 北京时间] Running screening job...")
-        if in_window:
+        if not self.trading_windows_enabled:
+            print("  ○ 优选时段加分已关闭")
+        elif in_window:
             print(f"  ★ 当前在优选时段内，额外加分: +{time_bonus}")
         else:
             next_window = self.get_next_trading_window()
             print(f"  ○ 普通时段（下一优选时段: {next_window}）")
 
         with get_db() as db:
-            screening_service = ScreeningService(db)
-            notification_service = NotificationService(db)
-            sim_trading_service = SimTradingService(db)
 
             # 获取通知设置
             ns = self._get_notification_settings(db)
 
-            all_results = []
-
-            for timeframe in timeframes:
-                try:
-                    print(f"  Screening {timeframe} timeframe...")
-                    results = screening_service.screen_altcoins(
-                        timeframe=timeframe,
-                        min_volume=settings.MIN_VOLUME_USD
-                    )
-
-                    # 使用通知设置中的分数阈值过滤
-                    high_score_results = [
-                        r for r in results
-                        if r['total_score'] >= ns.min_score_threshold
-                    ]
-
-                    if high_score_results:
-                        all_results.extend(high_score_results)
-                        print(f"  Found {len(high_score_results)} high-score opportunities in {timeframe}")
-
-                except Exception as e:
-                    print(f"  Error screening {timeframe}: {e}")
+            # 只保留分数最高的 notify_top_n 个结果（最小堆），内存占用与匹配数量无关
+            top_results = []
+            top_n = ns.notify_top_n or 0
+            tiebreak = itertools.count()
+
+            # 各周期的筛选是同步的 CPU/网络密集任务，放到线程池中并行执行，避免阻塞事件循环
+            print(f"  Screening {', '.join(timeframes)} timeframes...")
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=len(timeframes)) as pool:
+                screenings = await asyncio.gather(
+                    *[
+                        loop.run_in_executor(
+                            pool, self._screen_timeframe, self.binance, timeframe, ns.min_score_threshold
+                        )
+                        for timeframe in timeframes
+                    ],
+                    return_exceptions=True
+                )
+
+            for timeframe, results in zip(timeframes, screenings):
+                if isinstance(results, Exception):
+                    print(f"  Error screening {timeframe}: {results}")
+                    continue
+
+                # 结果已按通知设置中的分数阈值过滤
+                if results:
+                    for r in results:
+                        item = (r['total_score'], next(tiebreak), r)
+                        if len(top_results) < top_n:
+                            heapq.heappush(top_results, item)
+                        elif top_n:
+                            heapq.heappushpop(top_results, item)
+                    print(f"  Found {len(results)} high-score opportunities in {timeframe}")
 
             # Send notification if high-score opportunities found
-            if all_results and ns.notify_high_score:
-                # 检查是否可以发送通知
-                can_send, reason = self._can_send_notification(db, ns)
+            if top_results and ns.notify_high_score:
+                if not (ns.email_enabled or ns.telegram_enabled):
+                    can_send, reason = False, "邮件和Telegram通知均未启用"
+                else:
+                    # 检查是否可以发送通知（可以发送时已占用本次额度）
+                    previous_notification_time = ns.last_notification_time
+                    can_send, reason = self._can_send_notification(db, ns)
 
-                if can_send and (ns.email_enabled or ns.telegram_enabled):
+                if can_send:
                     try:
-                        # 按分数排序并取前N个
-                        all_results.sort(key=lambda x: x['total_score'], reverse=True)
-                        results_to_notify = all_results[:ns.notify_top_n]
+                        # 按分数从高到低取出前N个
+                        results_to_notify = [
+                            r for _, _, r in sorted(top_results, reverse=True)
+                        ]
 
-                        await notification_service.send_screening_alert(
+                        sent = await get_alert_batcher().submit(
                             results=results_to_notify,
                             timeframe='multi',
                             send_email=ns.email_enabled,
                             send_telegram=ns.telegram_enabled
                         )
 
-                        # 更新通知统计
-                        self._update_notification_stats(db, ns)
-
-                        print(f"  ✓ 通知已发送: {len(results_to_notify)} 个机会 (今日第 {ns.daily_count} 次)")
+                        if sent:
+                            print(f"  ✓ 通知已发送: {len(results_to_notify)} 个机会 ({reason})")
+                        elif sent is None:
+                            # 与上一次告警内容相同被跳过：归还已占用的额度
+                            self._release_notification_budget(db, ns.id, previous_notification_time)
+                            print(f"  ○ 跳过重复通知: {len(results_to_notify)} 个机会与上次相同")
+                        else:
+                            print(f"  ✗ 发送通知失败: {len(results_to_notify)} 个机会 ({reason})")
                     except Exception as e:
                         print(f"  ✗ 发送通知失败: {e}")
                 else:
@@ -202,30 +394,72 @@ class MonitorService:
 
             # 自动模拟交易 - 全天候执行，不再限制时间窗口
             try:
-                accounts = sim_trading_service.get_all_accounts()
-                for account in accounts:
-                    if account.auto_trading_enabled:
-                        print(f"  Auto trading check: {account.account_name}")
-                        actions = sim_trading_service.auto_trade_monitor(
-                            account.id,
-                            time_window_bonus=time_bonus
+                accounts = [
+                    (account.id, account.account_name)
+                    for account in SimTradingService(db, binance=self.binance).get_auto_trading_accounts()
+                ]
+                semaphore = asyncio.Semaphore(AUTO_TRADE_CONCURRENCY)
+
+                async def _auto_trade(account_id: int) -> Dict:
+                    async with semaphore:
+                        return await asyncio.to_thread(
+                            self._auto_trade_account, self.binance, account_id, time_bonus
                         )
 
-                        if actions.get('positions_opened'):
-                            print(f"    Opened {len(actions['positions_opened'])} positions")
-                            for pos in actions['positions_opened']:
-                                bonus_str = f" [+{time_bonus}bonus]" if time_bonus > 0 else ""
-                                print(f"      - {pos['symbol']} @ {pos['price']:.6f} (score: {pos['score']:.1f}{bonus_str})")
+                all_actions = await asyncio.gather(
+                    *[_auto_trade(account_id) for account_id, _ in accounts],
+                    return_exceptions=True
+                )
+
+                for (_, account_name), actions in zip(accounts, all_actions):
+                    print(f"  Auto trading check: {account_name}")
+                    if isinstance(actions, Exception):
+                        print(f"    Auto trading error: {actions}")
+                        continue
 
-                        if actions.get('positions_closed'):
-                            print(f"    Closed {len(actions['positions_closed'])} positions")
+                    if actions.get('positions_opened'):
+                        print(f"    Opened {len(actions['positions_opened'])} positions")
+                        for pos in actions['positions_opened']:
+                            bonus_str = f" [+{time_bonus}bonus]" if time_bonus > 0 else ""
+                            print(f"      - {pos['symbol']} @ {pos['price']:.6f} (score: {pos['score']:.1f}{bonus_str})")
+
+                    if actions.get('positions_closed'):
+                        print(f"    Closed {len(actions['positions_closed'])} positions")
 
             except Exception as e:
                 print(f"  Auto trading error: {e}")
                 import traceback
                 traceback.print_exc()
 
-        print(f"[{datetime.now(self.beijing_tz).strftime('%H:%M:%S')}] Screening job completed\n")
+        print(f"[{datetime.now(BEIJING_TZ).strftime('%H:%M:%S')}] Screening job completed\n")
+
+    @staticmethod
+    def _screen_timeframe(binance: BinanceService, timeframe: str, min_score: float = None) -> List[Dict]:
+        """
+        Screen one timeframe in its own session
+
+        Called from a worker thread so timeframes can be screened in parallel.
+        Only results scoring at least min_score are returned.
+        """
+        with get_db() as db:
+            service = ScreeningService(db, binance=binance)
+            return service.screen_altcoins(
+                timeframe=timeframe,
+                min_volume=settings.MIN_VOLUME_USD,
+                min_score=min_score
+            )
+
+    @staticmethod
+    def _auto_trade_account(binance: BinanceService, account_id: int, time_bonus: float) -> Dict:
+        """
+        Run auto trading for one account in its own session
+
+        Called from a worker thread; sessions are never shared between
+        concurrently running accounts.
+        """
+        with get_db() as db:
+            service = SimTradingService(db, binance=binance)
+            return service.auto_trade_monitor(account_id, time_window_bonus=time_bonus)
 
     def start_monitoring(self, timeframes: List[str] = None,
                          trading_windows: List[tuple] = None):
@@ -239,45 +473,82 @@ class MonitorService:
         self.is_running = True
 
         if trading_windows is not None:
-            self.trading_windows = trading_windows
+            self._set_trading_windows(trading_windows)
 
         print(f"Starting monitoring service (interval: {self.screening_interval}s)...")
         print("Trading mode: 24/7 (no time restriction)")
-        print(f"Preferred windows with +{self.trading_window_bonus} bonus (Beijing time):")
-        for start_h, start_m, end_h, end_m in self.trading_windows:
-            print(f"  - {start_h:02d}:{start_m:02d} - {end_h:02d}:{end_m:02d}")
-
-        # Schedule periodic screening
-        schedule.every(self.screening_interval).seconds.do(
-            lambda: asyncio.run(self.run_screening_job(timeframes))
-        )
+        if self.trading_windows_enabled:
+            print(f"Preferred windows with +{self.trading_window_bonus} bonus (Beijing time):")
+            for start_h, start_m, end_h, end_m in self.trading_windows:
+                print(f"  - {start_h:02d}:{start_m:02d} - {end_h:02d}:{end_m:02d}")
+        else:
+            print("Preferred window bonus: disabled")
 
-        # Schedule data cleanup every 10 days
-        schedule.every(10).days.do(self._run_cleanup)
         print("Data cleanup scheduled: every 10 days")
 
-        # Run initial screening immediately
-        asyncio.run(self.run_screening_job(timeframes))
+        # Single persistent event loop for the whole process
+        if UVLOOP_AVAILABLE:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            print("Event loop: uvloop")
+        asyncio.run(self._main(timeframes))
+
+    async def _main(self, timeframes: List[str] = None):
+        """Run the screening loop and the cleanup loop side by side"""
+        await asyncio.to_thread(self._warm_up_connections)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                cleanup_task = tg.create_task(self._cleanup_loop())
+                await self._run_loop(timeframes)
+                cleanup_task.cancel()
+        finally:
+            await close_notifications()
+
+    def _warm_up_connections(self):
+        """Pre-open database pool connections so the first screening cycle doesn't pay connect latency"""
+        try:
+            opened = warm_up_pool()
+            print(f"Database pool warmed: {opened} connections")
+        except Exception as e:
+            print(f"Database pool warm-up failed: {e}")
+
+        try:
+            from backend.database.timescale_db import engine as timescale_engine
+            opened = warm_up_pool(timescale_engine)
+            print(f"TimescaleDB pool warmed: {opened} connections")
+        except Exception as e:
+            print(f"TimescaleDB pool warm-up skipped: {e}")
+
+    async def _run_loop(self, timeframes: List[str] = None):
+        """
+        Main monitoring loop
+
+        Runs the first screening immediately, then one job per interval.
+        The interval timer runs alongside the job, so a cycle starts every
+        screening_interval seconds as long as the job finishes in time.
+        """
+        while self.is_running:
+            await asyncio.gather(
+                self.run_screening_job(timeframes),
+                asyncio.sleep(self.screening_interval)
+            )
 
-        # Keep running
+    async def _cleanup_loop(self):
+        """Run data cleanup every CLEANUP_INTERVAL seconds"""
         while self.is_running:
-            schedule.run_pending()
-            time.sleep(1)
+            await asyncio.sleep(CLEANUP_INTERVAL)
+            await asyncio.to_thread(self._run_cleanup)
 
     def _run_cleanup(self):
         """Run data cleanup task"""
         try:
-            from backend.database.session import get_db_session
-            from backend.services.screening_service import ScreeningService
-
-            db = next(get_db_session())
-            screening_service = ScreeningService(db)
-            deleted = screening_service.cleanup_old_data(
-                kline_days_short=15,  # Keep 5m/15m klines for 15 days
-                kline_days_long=90,   # Keep 1h/4h/1d klines for 90 days
-                screening_days=7      # Keep screening results for 7 days
-            )
-            db.close()
+            with get_db() as db:
+                screening_service = ScreeningService(db, binance=self.binance)
+                deleted = screening_service.cleanup_old_data(
+                    kline_days_short=15,  # Keep 5m/15m klines for 15 days
+                    kline_days_long=90,   # Keep 1h/4h/1d klines for 90 days
+                    screening_days=7      # Keep screening results for 7 days
+                )
 
             total = sum(deleted.values())
             if total > 0:
@@ -3,29 +3,385 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
 import asyncio
-from typing import List, Optional
-from telegram import Bot
-from telegram.error import TelegramError
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from telegram import Bot, InputMediaPhoto
+from telegram.error import RetryAfter, TelegramError
+from telegram.request import HTTPXRequest
 import os
 
 from backend.config import settings
+from backend.database.database import get_db
 from backend.database.models import Alert
+from backend.utils.logger import get_notification_logger
+from backend.utils.rate_limiter import TokenBucket
 from sqlalchemy.orm import Session
 from datetime import datetime
+from contextlib import asynccontextmanager
+import functools
+import hashlib
+import json
+import time
+from html import escape
+
+# Initialize logger
+logger = get_notification_logger()
+
+# 最近使用的附件缓存数量（图表图片通常在多次告警中重复使用）
+ATTACHMENT_CACHE_SIZE = 16
+
+# 告警日志批量写入：攒满ALERT_LOG_BATCH_SIZE条或等待ALERT_LOG_FLUSH_INTERVAL秒后写入
+ALERT_LOG_BATCH_SIZE = 50
+ALERT_LOG_FLUSH_INTERVAL = 2.0
+
+# Telegram HTTP连接池大小（按突发告警并发量设置）及单次相册最多图片数
+TELEGRAM_POOL_SIZE = 8
+TELEGRAM_MEDIA_GROUP_MAX = 10
+
+# Telegram限流：每分钟200条、突发20条；被限流(RetryAfter)时按服务端要求等待后重试
+TELEGRAM_RATE_PER_MINUTE = 200
+TELEGRAM_BURST = 20
+TELEGRAM_MAX_RETRIES = 3
+
+# 同一个Bot的所有请求共享一个令牌桶
+_telegram_bucket = TokenBucket(rate=TELEGRAM_RATE_PER_MINUTE / 60, capacity=TELEGRAM_BURST)
+
+
+@functools.lru_cache(maxsize=ATTACHMENT_CACHE_SIZE)
+def _read_file_cached(filepath: str, mtime_ns: int, size: int) -> bytes:
+    """Read a file once per (path, mtime, size) version"""
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+
+# 可作为邮件附件的图片扩展名及对应的MIME子类型（无需MIMEImage再嗅探格式）
+_IMAGE_SUBTYPES = {'.png': 'png', '.jpg': 'jpeg', '.jpeg': 'jpeg', '.webp': 'webp'}
+_IMAGE_EXTS = tuple(_IMAGE_SUBTYPES)
+
+
+@functools.lru_cache(maxsize=ATTACHMENT_CACHE_SIZE)
+def _image_part_cached(filepath: str, mtime_ns: int, size: int) -> MIMEImage:
+    """Build (and base64-encode) the MIME part once per file version"""
+    subtype = _IMAGE_SUBTYPES[os.path.splitext(filepath)[1]]
+    img = MIMEImage(_read_file_cached(filepath, mtime_ns, size), _subtype=subtype)
+    img.add_header('Content-Disposition', 'attachment',
+                   filename=os.path.basename(filepath))
+    return img
+
+
+def _load_file(filepath: str) -> Optional[bytes]:
+    """Return file contents, or None if the file does not exist"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return _read_file_cached(filepath, st.st_mtime_ns, st.st_size)
+
+
+def _load_image_part(filepath: str) -> Optional[MIMEImage]:
+    """Return the cached MIMEImage attachment for a file, or None if it is missing or empty"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    if st.st_size == 0:
+        return None
+    return _image_part_cached(filepath, st.st_mtime_ns, st.st_size)
+
+
+# 信号字段及其在各渠道的显示文本：(字段, 纯文本, Telegram, HTML)
+# Telegram消息不显示价格异常信号
+_SIGNAL_DEFS: Tuple[Tuple[str, str, Optional[str], str], ...] = (
+    ('above_sma', 'Above SMA', '✅ Above SMA', '<span class="signal">Above SMA</span>'),
+    ('macd_golden_cross', 'MACD Golden Cross', '⭐ MACD Cross', '<span class="signal">MACD Cross</span>'),
+    ('above_all_ema', 'Above All EMAs', '📊 Above EMAs', '<span class="signal">Above EMAs</span>'),
+    ('volume_surge', 'Volume Surge', '📢 Volume Surge', '<span class="signal">Volume Surge</span>'),
+    ('price_anomaly', 'Price Anomaly', None, '<span class="signal">Anomaly</span>'),
+)
+
+# 告警中展示的结果数量（Telegram只展示前TELEGRAM_TOP_N个）
+ALERT_TOP_N = 10
+TELEGRAM_TOP_N = 5
+
+# 渲染结果缓存条数
+RENDER_CACHE_SIZE = 64
+
+
+class _AlertRow(NamedTuple):
+    """One result row as the alert renderers need it, with signal labels precomputed"""
+    symbol: str
+    total_score: float
+    current_price: float
+    btc_ratio_change_pct: float
+    eth_ratio_change_pct: float
+    volume_24h: float
+    signals_text: Tuple[str, ...]
+    signals_tg: Tuple[str, ...]
+    signals_html: Tuple[str, ...]
+
+
+def _to_alert_rows(results: List[dict]) -> List[_AlertRow]:
+    """Convert the top results to _AlertRow once so all renderers share them"""
+    rows = []
+    for r in results[:ALERT_TOP_N]:
+        # 每个信号字段只判断一次，三个渠道的标签都从同一结果派生
+        active = [d for d in _SIGNAL_DEFS if r.get(d[0])]
+        rows.append(_AlertRow(
+            symbol=r['symbol'],
+            total_score=r['total_score'],
+            current_price=r['current_price'],
+            btc_ratio_change_pct=r['btc_ratio_change_pct'],
+            eth_ratio_change_pct=r['eth_ratio_change_pct'],
+            volume_24h=r['volume_24h'],
+            signals_text=tuple(d[1] for d in active),
+            signals_tg=tuple(d[2] for d in active if d[2]),
+            signals_html=tuple(d[3] for d in active)
+        ))
+    return rows
+
+
+def _alert_key(results: List[dict], timeframe: str) -> bytes:
+    """Stable digest of what an alert is about (timeframe + top symbols and scores)"""
+    payload = json.dumps(
+        [timeframe, [(r['symbol'], round(r['total_score'], 2)) for r in results[:ALERT_TOP_N]]]
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+
+# 邮件HTML的固定头部（样式和表头）与尾部，只需格式化时间周期
+_HTML_HEADER = """
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; }}
+                table {{ border-collapse: collapse; width: 100%; }}
+                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+                th {{ background-color: #4CAF50; color: white; }}
+                .high-score {{ background-color: #d4edda; }}
+                .signal {{ display: inline-block; padding: 2px 8px; margin: 2px;
+                          background-color: #007bff; color: white; border-radius: 3px;
+                          font-size: 12px; }}
+            </style>
+        </head>
+        <body>
+            <h2>🚀 Altcoin Screening Results - {timeframe}</h2>
+            <table>
+                <tr>
+                    <th>Rank</th>
+                    <th>Symbol</th>
+                    <th>Score</th>
+                    <th>Price</th>
+                    <th>BTC Change</th>
+                    <th>ETH Change</th>
+                    <th>Volume 24h</th>
+                    <th>Signals</th>
+                </tr>
+        """
+
+# 每行结果的格式模板（格式说明只解析一次）
+_TEXT_ROW_FMT = (
+    "{i}. {symbol}\n"
+    "   Score: {score:.2f}\n"
+    "   Price: ${price:.6f}\n"
+    "   BTC Ratio Change: {btc:.2f}%\n"
+    "   ETH Ratio Change: {eth:.2f}%\n"
+    "   Volume 24h: ${vol:,.0f}\n"
+)
+
+_HTML_ROW_FMT = """
+                <tr class="{cls}">
+                    <td>{i}</td>
+                    <td><strong>{symbol}</strong></td>
+                    <td>{score:.2f}</td>
+                    <td>${price:.6f}</td>
+                    <td>{btc:.2f}%</td>
+                    <td>{eth:.2f}%</td>
+                    <td>${vol:,.0f}</td>
+                    <td>{signals}</td>
+                </tr>
+            """
+
+_HTML_FOOTER = """
+            </table>
+        </body>
+        </html>
+        """
+
+
+class _SMTPSlot:
+    """One pool slot: a (possibly not yet connected) SMTP client and its message count"""
+
+    __slots__ = ('smtp', 'sent')
+
+    def __init__(self):
+        self.smtp: Optional[aiosmtplib.SMTP] = None
+        self.sent = 0
+
+
+class SMTPPool:
+    """
+    Pool of persistent SMTP connections
+
+    Holds up to `size` authenticated connections so concurrent alerts send
+    in parallel without opening a new TCP+TLS+AUTH session per email.
+    Connections are opened lazily, re-opened after a disconnect, and rotated
+    after `max_msgs_per_conn` messages to stay under provider per-connection caps.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_msgs_per_conn: Optional[int] = None):
+        self.size = size or settings.SMTP_POOL_SIZE
+        self.max_msgs_per_conn = max_msgs_per_conn or settings.SMTP_MAX_MSGS_PER_CONN
+        self._pool: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.size):
+            self._pool.put_nowait(_SMTPSlot())
+
+    @staticmethod
+    async def _connect() -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            start_tls=False,
+            use_tls=False
+        )
+        await smtp.connect()
+        await smtp.starttls()
+        await smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return smtp
+
+    @staticmethod
+    async def _quit(smtp: aiosmtplib.SMTP):
+        if smtp.is_connected:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+    async def acquire(self) -> _SMTPSlot:
+        """Take a slot from the pool, making sure its connection is usable"""
+        slot = await self._pool.get()
+        try:
+            if slot.smtp is not None and slot.sent >= self.max_msgs_per_conn:
+                await self._quit(slot.smtp)
+                slot.smtp = None
+
+            if slot.smtp is None or not slot.smtp.is_connected:
+                slot.smtp = await self._connect()
+                slot.sent = 0
+        except Exception:
+            slot.smtp = None
+            self._pool.put_nowait(slot)
+            raise
+        return slot
+
+    def release(self, slot: _SMTPSlot):
+        """Return a slot to the pool"""
+        self._pool.put_nowait(slot)
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow a connected SMTP client for the duration of the block"""
+        slot = await self.acquire()
+        try:
+            yield slot.smtp
+            slot.sent += 1
+        finally:
+            self.release(slot)
+
+    async def close(self):
+        """QUIT every idle connection in the pool"""
+        for _ in range(self._pool.qsize()):
+            slot = self._pool.get_nowait()
+            if slot.smtp is not None:
+                await self._quit(slot.smtp)
+                slot.smtp = None
+            self._pool.put_nowait(slot)
+
+
+_smtp_pool: Optional[SMTPPool] = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    """Process-wide SMTP pool shared by all NotificationService instances"""
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPPool()
+    return _smtp_pool
+
+
+async def close_smtp_pool():
+    """Close the shared SMTP pool (call on shutdown)"""
+    if _smtp_pool is not None:
+        await _smtp_pool.close()
+
+
+_alert_buffer: List[Alert] = []
+_alert_flush_task: Optional[asyncio.Task] = None
+
+
+def _write_alerts(alerts: List[Alert]):
+    """Insert buffered alerts in one transaction (runs in a worker thread)"""
+    with get_db() as db:
+        db.bulk_save_objects(alerts)
+
+
+async def _flush_alert_log_later():
+    global _alert_flush_task
+    await asyncio.sleep(ALERT_LOG_FLUSH_INTERVAL)
+    _alert_flush_task = None
+    await flush_alert_log()
+
+
+async def flush_alert_log():
+    """Write all buffered alert log rows now (also call on shutdown)"""
+    global _alert_buffer, _alert_flush_task
+    if _alert_flush_task is not None:
+        _alert_flush_task.cancel()
+        _alert_flush_task = None
+
+    alerts, _alert_buffer = _alert_buffer, []
+    if not alerts:
+        return
+
+    try:
+        await asyncio.to_thread(_write_alerts, alerts)
+    except Exception:
+        logger.exception("Failed to log %d alerts", len(alerts))
 
 
 class NotificationService:
     """Service for sending email and Telegram notifications"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session] = None, smtp_pool: Optional[SMTPPool] = None):
+        # 告警日志由后台线程用独立会话批量写入（见 flush_alert_log），
+        # 不在事件循环中执行同步数据库操作；db 仅为兼容旧调用方保留
         self.db = db
+        # SMTP连接池在服务实例之间共享，避免每次请求重新握手
+        self.smtp_pool = smtp_pool or get_smtp_pool()
+
+        # 收件人配置是静态的，只解析一次（支持多个收件人，逗号分隔）
+        self._recipients = [e.strip() for e in (settings.EMAIL_TO or '').split(',') if e.strip()]
+        self._recipients_hdr = ', '.join(self._recipients)  # 格式化为标准的收件人列表
+        self._from = settings.SMTP_USER
+
+        # 相同结果集的告警正文只渲染一次
+        self._render = functools.lru_cache(maxsize=RENDER_CACHE_SIZE)(self._render_bodies)
+
+        # 最近一次成功发送的告警摘要，用于在去重窗口内跳过重复告警
+        self._last_alert_key: Optional[bytes] = None
+        self._last_alert_at = 0.0
         self.telegram_bot = None
 
         if settings.TELEGRAM_BOT_TOKEN:
             try:
-                self.telegram_bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
-            except Exception as e:
-                print(f"Failed to initialize Telegram bot: {e}")
+                self.telegram_bot = Bot(
+                    token=settings.TELEGRAM_BOT_TOKEN,
+                    request=HTTPXRequest(
+                        connection_pool_size=TELEGRAM_POOL_SIZE,
+                        connect_timeout=5.0,
+                        read_timeout=20.0
+                    )
+                )
+            except Exception:
+                logger.exception("Failed to initialize Telegram bot")
 
     async def send_email(
         self,
@@ -46,57 +402,66 @@ class NotificationService:
         Returns:
             True if successful
         """
-        if not all([settings.SMTP_USER, settings.SMTP_PASSWORD, settings.EMAIL_TO]):
-            print("Email settings not configured")
+        if not (self._from and settings.SMTP_PASSWORD and self._recipients):
+            logger.warning("Email settings not configured")
             return False
 
         try:
-            # 支持多个收件人（逗号分隔）
-            recipients = [email.strip() for email in settings.EMAIL_TO.split(',')]
-
-            # Create message
-            message = MIMEMultipart('alternative')
-            message['From'] = settings.SMTP_USER
-            message['To'] = ', '.join(recipients)  # 格式化为标准的收件人列表
-            message['Subject'] = subject
-
-            # Add text part
-            text_part = MIMEText(body, 'plain')
-            message.attach(text_part)
-
-            # Add HTML part if provided
-            if html:
-                html_part = MIMEText(html, 'html')
-                message.attach(html_part)
-
-            # Add attachments
-            if attachments:
-                for filepath in attachments:
-                    if os.path.exists(filepath):
-                        with open(filepath, 'rb') as f:
-                            if filepath.endswith('.png') or filepath.endswith('.jpg'):
-                                img = MIMEImage(f.read())
-                                img.add_header('Content-Disposition', 'attachment',
-                                             filename=os.path.basename(filepath))
-                                message.attach(img)
-
-            # Send email
-            await aiosmtplib.send(
-                message,
-                hostname=settings.SMTP_HOST,
-                port=settings.SMTP_PORT,
-                username=settings.SMTP_USER,
-                password=settings.SMTP_PASSWORD,
-                start_tls=True
+            # MIME构建和附件的读取、base64编码都是阻塞/CPU工作，放到线程中执行
+            message = await asyncio.to_thread(
+                self._build_message, subject, body, html, attachments
             )
 
-            print(f"Email sent successfully: {subject}")
+            # Send email over a pooled connection; retry once if the server dropped it
+            for attempt in range(2):
+                try:
+                    async with self.smtp_pool.lease() as smtp:
+                        await smtp.send_message(message)
+                    break
+                except aiosmtplib.SMTPServerDisconnected:
+                    if attempt:
+                        raise
+
+            logger.info("Email sent: %s", subject)
             return True
 
-        except Exception as e:
-            print(f"Failed to send email: {e}")
+        except Exception:
+            logger.exception("Failed to send email")
             return False
 
+    def _build_message(
+        self,
+        subject: str,
+        body: str,
+        html: Optional[str] = None,
+        attachments: Optional[List[str]] = None
+    ) -> MIMEMultipart:
+        """Build the MIME message for send_email (sync, runs in a worker thread)"""
+        # Create message
+        message = MIMEMultipart('alternative')
+        message['From'] = self._from
+        message['To'] = self._recipients_hdr
+        message['Subject'] = subject
+
+        # Add text part
+        text_part = MIMEText(body, 'plain')
+        message.attach(text_part)
+
+        # Add HTML part if provided
+        if html:
+            html_part = MIMEText(html, 'html')
+            message.attach(html_part)
+
+        # Add attachments
+        if attachments:
+            for filepath in attachments:
+                if filepath.endswith(_IMAGE_EXTS):
+                    img = _load_image_part(filepath)
+                    if img is not None:
+                        message.attach(img)
+
+        return message
+
     async def send_telegram(
         self,
         message: str,
@@ -113,29 +478,88 @@ class NotificationService:
             True if successful
         """
         if not self.telegram_bot or not settings.TELEGRAM_CHAT_ID:
-            print("Telegram settings not configured")
+            logger.warning("Telegram settings not configured")
             return False
 
         try:
-            if image_path and os.path.exists(image_path):
-                with open(image_path, 'rb') as photo:
-                    await self.telegram_bot.send_photo(
-                        chat_id=settings.TELEGRAM_CHAT_ID,
-                        photo=photo,
-                        caption=message
-                    )
+            photo = await asyncio.to_thread(_load_file, image_path) if image_path else None
+            if photo is not None:
+                await self._telegram_call(
+                    self.telegram_bot.send_photo,
+                    chat_id=settings.TELEGRAM_CHAT_ID,
+                    photo=photo,
+                    caption=message
+                )
             else:
-                await self.telegram_bot.send_message(
+                await self._telegram_call(
+                    self.telegram_bot.send_message,
                     chat_id=settings.TELEGRAM_CHAT_ID,
                     text=message,
                     parse_mode='HTML'
                 )
 
-            print("Telegram message sent successfully")
+            logger.info("Telegram message sent")
             return True
 
         except TelegramError as e:
-            print(f"Failed to send Telegram message: {e}")
+            logger.error("Failed to send Telegram message: %s", e)
+            return False
+
+    async def _telegram_call(self, method, **kwargs):
+        """Call a Bot method through the shared rate limiter, honoring RetryAfter"""
+        for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+            await _telegram_bucket.acquire_async()
+            try:
+                return await method(**kwargs)
+            except RetryAfter as e:
+                if attempt == TELEGRAM_MAX_RETRIES:
+                    raise
+                logger.warning("Telegram flood control, retrying in %ss", e.retry_after)
+                await asyncio.sleep(e.retry_after)
+
+    async def send_telegram_album(
+        self,
+        captions: List[str],
+        image_paths: List[str]
+    ) -> bool:
+        """
+        Send several images as Telegram media groups (one API call per 10 images)
+
+        Args:
+            captions: Caption for each image (matched by position)
+            image_paths: Paths of images to send; missing files are skipped
+
+        Returns:
+            True if successful
+        """
+        if not self.telegram_bot or not settings.TELEGRAM_CHAT_ID:
+            logger.warning("Telegram settings not configured")
+            return False
+
+        try:
+            photos = await asyncio.gather(
+                *(asyncio.to_thread(_load_file, path) for path in image_paths)
+            )
+            media = [
+                InputMediaPhoto(media=photo, caption=caption)
+                for photo, caption in zip(photos, captions)
+                if photo is not None
+            ]
+            if not media:
+                return False
+
+            for start in range(0, len(media), TELEGRAM_MEDIA_GROUP_MAX):
+                await self._telegram_call(
+                    self.telegram_bot.send_media_group,
+                    chat_id=settings.TELEGRAM_CHAT_ID,
+                    media=media[start:start + TELEGRAM_MEDIA_GROUP_MAX]
+                )
+
+            logger.info("Telegram album sent: %d images", len(media))
+            return True
+
+        except TelegramError as e:
+            logger.error("Failed to send Telegram album: %s", e)
             return False
 
     async def send_screening_alert(
@@ -143,8 +567,9 @@ class NotificationService:
         results: List[dict],
         timeframe: str,
         send_email: bool = True,
-        send_telegram: bool = True
-    ) -> bool:
+        send_telegram: bool = True,
+        dedup: bool = True
+    ) -> Optional[bool]:
         """
         Send alert about screening results
 
@@ -153,9 +578,11 @@ class NotificationService:
             timeframe: Timeframe analyzed
             send_email: Whether to send email
             send_telegram: Whether to send Telegram
+            dedup: Skip the alert if it repeats the last one within ALERT_DEDUP_WINDOW_SEC
 
         Returns:
-            True if at least one notification was sent
+            True if at least one notification was sent, False if sending failed,
+            None if skipped as a duplicate of the last alert
         """
         if not results:
             return False
@@ -163,191 +590,265 @@ class NotificationService:
         # Create message
         subject = f"🚀 Altcoin Screening Alert - {len(results)} Opportunities Found"
 
-        # Plain text message
-        text_message = self._create_text_alert(results, timeframe)
-
-        # HTML message
-        html_message = self._create_html_alert(results, timeframe)
-
-        # Telegram message
-        telegram_message = self._create_telegram_alert(results, timeframe)
-
-        success = False
-
-        # Send email
+        # 去重窗口内与上一次告警内容相同则不再发送
+        alert_key = _alert_key(results, timeframe)
+        now = time.monotonic()
+        if (dedup and alert_key == self._last_alert_key
+                and now - self._last_alert_at < settings.ALERT_DEDUP_WINDOW_SEC):
+            logger.info("Skipping duplicate alert (same results as the last one)")
+            return None
+
+        # Plain text, HTML and Telegram messages
+        text_message, html_message, telegram_message = self._render(
+            tuple(_to_alert_rows(results)), timeframe, len(results)
+        )
+
+        # 邮件和Telegram互不依赖，并发发送
+        channels = []
+        tasks = []
         if send_email:
-            email_sent = await self.send_email(
+            channels.append('email')
+            tasks.append(self.send_email(
                 subject=subject,
                 body=text_message,
                 html=html_message
-            )
-            success = success or email_sent
-
-        # Send Telegram
+            ))
         if send_telegram:
-            telegram_sent = await self.send_telegram(telegram_message)
-            success = success or telegram_sent
+            channels.append('telegram')
+            tasks.append(self.send_telegram(telegram_message))
+
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        sent_via = [channel for channel, ok in zip(channels, outcomes) if ok is True]
+        success = bool(sent_via)
 
         # Log alert
         if success:
-            self._log_alert(
+            if dedup:
+                self._last_alert_key, self._last_alert_at = alert_key, now
+            await self._log_alert(
                 alert_type='screening',
                 message=subject,
                 data={'count': len(results), 'timeframe': timeframe},
-                sent_via='email' if send_email else '' + ',telegram' if send_telegram else ''
+                sent_via=','.join(sent_via)
             )
 
         return success
 
-    def _create_text_alert(self, results: List[dict], timeframe: str) -> str:
+    def _render_bodies(
+        self,
+        rows: Tuple[_AlertRow, ...],
+        timeframe: str,
+        total: int
+    ) -> Tuple[str, str, str]:
+        """Render (text, html, telegram) bodies; memoized per service via self._render"""
+        return (
+            self._create_text_alert(rows, timeframe),
+            self._create_html_alert(rows, timeframe),
+            self._create_telegram_alert(rows, timeframe, total)
+        )
+
+    def _create_text_alert(self, rows: Tuple[_AlertRow, ...], timeframe: str) -> str:
         """Create plain text alert message"""
-        message = f"Altcoin Screening Results - {timeframe}\n"
-        message += "=" * 60 + "\n\n"
-
-        for i, result in enumerate(results[:10], 1):  # Top 10
-            message += f"{i}. {result['symbol']}\n"
-            message += f"   Score: {result['total_score']:.2f}\n"
-            message += f"   Price: ${result['current_price']:.6f}\n"
-            message += f"   BTC Ratio Change: {result['btc_ratio_change_pct']:.2f}%\n"
-            message += f"   ETH Ratio Change: {result['eth_ratio_change_pct']:.2f}%\n"
-            message += f"   Volume 24h: ${result['volume_24h']:,.0f}\n"
-
-            signals = []
-            if result['above_sma']:
-                signals.append("Above SMA")
-            if result['macd_golden_cross']:
-                signals.append("MACD Golden Cross")
-            if result['above_all_ema']:
-                signals.append("Above All EMAs")
-            if result['volume_surge']:
-                signals.append("Volume Surge")
-            if result['price_anomaly']:
-                signals.append("Price Anomaly")
-
-            if signals:
-                message += f"   Signals: {', '.join(signals)}\n"
-
-            message += "\n"
+        parts: List[str] = [
+            f"Altcoin Screening Results - {timeframe}\n",
+            "=" * 60 + "\n\n"
+        ]
+
+        for i, row in enumerate(rows, 1):
+            parts.append(_TEXT_ROW_FMT.format_map({
+                'i': i,
+                'symbol': row.symbol,
+                'score': row.total_score,
+                'price': row.current_price,
+                'btc': row.btc_ratio_change_pct,
+                'eth': row.eth_ratio_change_pct,
+                'vol': row.volume_24h
+            }))
+
+            if row.signals_text:
+                parts.append(f"   Signals: {', '.join(row.signals_text)}\n")
+
+            parts.append("\n")
+
+        return "".join(parts)
+
+    def _create_html_alert(self, rows: Tuple[_AlertRow, ...], timeframe: str) -> str:
+        """Create HTML alert message (dynamic text is HTML-escaped)"""
+        parts: List[str] = [_HTML_HEADER.format(timeframe=escape(timeframe))]
+
+        for i, row in enumerate(rows, 1):
+            parts.append(_HTML_ROW_FMT.format_map({
+                'cls': 'high-score' if row.total_score >= 70 else '',
+                'i': i,
+                'symbol': escape(row.symbol),
+                'score': row.total_score,
+                'price': row.current_price,
+                'btc': row.btc_ratio_change_pct,
+                'eth': row.eth_ratio_change_pct,
+                'vol': row.volume_24h,
+                'signals': ''.join(row.signals_html)
+            }))
+
+        parts.append(_HTML_FOOTER)
+
+        return "".join(parts)
+
+    def _create_telegram_alert(self, rows: Tuple[_AlertRow, ...], timeframe: str, total: int) -> str:
+        """Create Telegram alert message (parse_mode=HTML, so dynamic text is escaped)"""
+        parts: List[str] = [
+            "🚀 <b>Altcoin Screening Alert</b>\n"
+            f"📊 Timeframe: {escape(timeframe)}\n"
+            f"🎯 Found {total} opportunities\n\n"
+        ]
+
+        for i, row in enumerate(rows[:TELEGRAM_TOP_N], 1):
+            parts.append(
+                f"<b>{i}. {escape(row.symbol)}</b>\n"
+                f"💯 Score: {row.total_score:.2f}\n"
+                f"💰 Price: ${row.current_price:.6f}\n"
+                f"📈 BTC Change: {row.btc_ratio_change_pct:.2f}%\n"
+                f"📈 ETH Change: {row.eth_ratio_change_pct:.2f}%\n"
+            )
 
-        return message
+            if row.signals_tg:
+                parts.append("\n".join(row.signals_tg) + "\n")
 
-    def _create_html_alert(self, results: List[dict], timeframe: str) -> str:
-        """Create HTML alert message"""
-        html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #4CAF50; color: white; }}
-                .high-score {{ background-color: #d4edda; }}
-                .signal {{ display: inline-block; padding: 2px 8px; margin: 2px;
-                          background-color: #007bff; color: white; border-radius: 3px;
-                          font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <h2>🚀 Altcoin Screening Results - {timeframe}</h2>
-            <table>
-                <tr>
-                    <th>Rank</th>
-                    <th>Symbol</th>
-                    <th>Score</th>
-                    <th>Price</th>
-                    <th>BTC Change</th>
-                    <th>ETH Change</th>
-                    <th>Volume 24h</th>
-                    <th>Signals</th>
-                </tr>
-        """
+            parts.append("\n")
 
-        for i, result in enumerate(results[:10], 1):
-            row_class = 'high-score' if result['total_score'] >= 70 else ''
-
-            signals = []
-            if result['above_sma']:
-                signals.append('<span class="signal">Above SMA</span>')
-            if result['macd_golden_cross']:
-                signals.append('<span class="signal">MACD Cross</span>')
-            if result['above_all_ema']:
-                signals.append('<span class="signal">Above EMAs</span>')
-            if result['volume_surge']:
-                signals.append('<span class="signal">Volume Surge</span>')
-            if result['price_anomaly']:
-                signals.append('<span class="signal">Anomaly</span>')
-
-            html += f"""
-                <tr class="{row_class}">
-                    <td>{i}</td>
-                    <td><strong>{result['symbol']}</strong></td>
-                    <td>{result['total_score']:.2f}</td>
-                    <td>${result['current_price']:.6f}</td>
-                    <td>{result['btc_ratio_change_pct']:.2f}%</td>
-                    <td>{result['eth_ratio_change_pct']:.2f}%</td>
-                    <td>${result['volume_24h']:,.0f}</td>
-                    <td>{''.join(signals)}</td>
-                </tr>
-            """
+        return "".join(parts)
 
-        html += """
-            </table>
-        </body>
-        </html>
+    async def _log_alert(
+        self,
+        alert_type: str,
+        message: str,
+        data: dict,
+        sent_via: str,
+        symbol: str = None
+    ):
+        """Queue alert for the buffered database log"""
+        global _alert_flush_task
+        _alert_buffer.append(Alert(
+            symbol=symbol or 'MULTIPLE',
+            alert_type=alert_type,
+            message=message,
+            data=data,
+            sent_via=sent_via,
+            timestamp=datetime.utcnow()
+        ))
+
+        if len(_alert_buffer) >= ALERT_LOG_BATCH_SIZE:
+            await flush_alert_log()
+        elif _alert_flush_task is None:
+            _alert_flush_task = asyncio.create_task(_flush_alert_log_later())
+
+
+class AlertBatcher:
+    """
+    Coalesce screening alerts that arrive in bursts
+
+    Alerts submitted within `window_ms` of the first pending one (or until
+    `max_alerts` are queued) are merged and sent as one email and one
+    Telegram message. Each submitter waits for and receives the result of
+    the combined send.
+    """
+
+    def __init__(
+        self,
+        service: Optional[NotificationService] = None,
+        window_ms: Optional[int] = None,
+        max_alerts: Optional[int] = None
+    ):
+        self.service = service or NotificationService()
+        self.window = (window_ms or settings.ALERT_BATCH_WINDOW_MS) / 1000
+        self.max_alerts = max_alerts or settings.ALERT_BATCH_MAX
+        self._pending: List[Tuple[List[dict], str, bool, bool, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        results: List[dict],
+        timeframe: str,
+        send_email: bool = True,
+        send_telegram: bool = True
+    ) -> Optional[bool]:
         """
+        Queue an alert for the next batch
 
-        return html
+        Returns:
+            True if the batch containing this alert was sent on at least one channel,
+            False if sending failed, None if the batch was skipped as a duplicate
+        """
+        if not results:
+            return False
 
-    def _create_telegram_alert(self, results: List[dict], timeframe: str) -> str:
-        """Create Telegram alert message"""
-        message = f"🚀 <b>Altcoin Screening Alert</b>\n"
-        message += f"📊 Timeframe: {timeframe}\n"
-        message += f"🎯 Found {len(results)} opportunities\n\n"
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((results, timeframe, send_email, send_telegram, future))
+
+        if len(self._pending) >= self.max_alerts:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Send everything pending now (also call on shutdown)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        # 按通知渠道分组，每组合并为一次发送
+        groups: Dict[Tuple[bool, bool], list] = {}
+        for item in pending:
+            groups.setdefault((item[2], item[3]), []).append(item)
+
+        for (send_email, send_telegram), items in groups.items():
+            merged = sorted(
+                (r for item in items for r in item[0]),
+                key=lambda r: r['total_score'],
+                reverse=True
+            )
+            timeframe = ','.join(dict.fromkeys(item[1] for item in items))
 
-        for i, result in enumerate(results[:5], 1):  # Top 5 for Telegram
-            message += f"<b>{i}. {result['symbol']}</b>\n"
-            message += f"💯 Score: {result['total_score']:.2f}\n"
-            message += f"💰 Price: ${result['current_price']:.6f}\n"
-            message += f"📈 BTC Change: {result['btc_ratio_change_pct']:.2f}%\n"
-            message += f"📈 ETH Change: {result['eth_ratio_change_pct']:.2f}%\n"
+            try:
+                success = await self.service.send_screening_alert(
+                    results=merged,
+                    timeframe=timeframe,
+                    send_email=send_email,
+                    send_telegram=send_telegram
+                )
+            except Exception:
+                logger.exception("Failed to send batched alert")
+                success = False
 
-            signals = []
-            if result['above_sma']:
-                signals.append("✅ Above SMA")
-            if result['macd_golden_cross']:
-                signals.append("⭐ MACD Cross")
-            if result['above_all_ema']:
-                signals.append("📊 Above EMAs")
-            if result['volume_surge']:
-                signals.append("📢 Volume Surge")
+            for item in items:
+                if not item[4].done():
+                    item[4].set_result(success)
 
-            if signals:
-                message += "\n".join(signals) + "\n"
 
-            message += "\n"
+_alert_batcher: Optional[AlertBatcher] = None
 
-        return message
 
-    def _log_alert(
-        self,
-        alert_type: str,
-        message: str,
-        data: dict,
-        sent_via: str,
-        symbol: str = None
-    ):
-        """Log alert to database"""
-        try:
-            alert = Alert(
-                symbol=symbol or 'MULTIPLE',
-                alert_type=alert_type,
-                message=message,
-                data=data,
-                sent_via=sent_via,
-                timestamp=datetime.utcnow()
-            )
-            self.db.add(alert)
-            self.db.commit()
-        except Exception as e:
-            print(f"Failed to log alert: {e}")
-            self.db.rollback()
+def get_alert_batcher() -> AlertBatcher:
+    """Process-wide alert batcher"""
+    global _alert_batcher
+    if _alert_batcher is None:
+        _alert_batcher = AlertBatcher()
+    return _alert_batcher
+
+
+async def close_notifications():
+    """Flush pending alerts and the alert log, then close SMTP connections (call on shutdown)"""
+    if _alert_batcher is not None:
+        await _alert_batcher.flush()
+    await flush_alert_log()
+    await close_smtp_pool()
@@ -1,12 +1,18 @@
+import bisect
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Tuple
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
+import threading
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from backend.services.binance_service import BinanceService
-from backend.services.indicator_service import IndicatorService
+from backend.services.indicator_service import IndicatorService, IndicatorResult, INDICATOR_WARMUP_ROWS
 from backend.database.models import KlineData, TechnicalIndicators, ScreeningResult
 from backend.config import settings
 from backend.utils.logger import get_screening_logger
@@ -14,24 +20,115 @@ from backend.utils.logger import get_screening_logger
 # Initialize logger
 logger = get_screening_logger()
 
-# 并行处理配置
-MAX_WORKERS = 5  # 并行线程数（降低以避免API限制）
+# 并发处理配置（K线请求速率由 BinanceService 的请求权重令牌桶控制）
 SCREENING_TIMEOUT = 120  # 筛选超时时间（秒）
 
+# screening_results 表的列名
+SCREENING_RESULT_COLUMNS = frozenset(ScreeningResult.__table__.columns.keys())
+
+# 机会列表返回的列（与 _screening_result_to_dict 一致）
+TOP_OPPORTUNITY_COLUMNS = (
+    'id', 'symbol', 'timestamp', 'timeframe', 'current_price',
+    'btc_ratio_change_pct', 'eth_ratio_change_pct',
+    'beta_score', 'volume_score', 'technical_score', 'total_score',
+    'above_sma', 'macd_golden_cross', 'above_all_ema', 'volume_surge', 'price_anomaly',
+    'volume_24h', 'volume_change_pct',
+    'price_change_5m', 'price_change_15m', 'price_change_1h', 'price_change_4h',
+)
+
+# 指标摘要缓存的最大条目数
+INDICATOR_CACHE_SIZE = 1024
+
+# 写入 klines 表的K线列
+KLINE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'quote_volume']
+# 多行 VALUES 插入每批的行数（每行10个参数，保持在 SQLite 旧版999个绑定参数上限以内）
+KLINE_INSERT_CHUNK = 90
+
+# 各周期对应的分钟数
+TIMEFRAME_MINUTES = {
+    '1m': 1,
+    '5m': 5,
+    '15m': 15,
+    '30m': 30,
+    '1h': 60,
+    '4h': 240,
+    '1d': 1440,
+}
+
+# 最新K线超过此时长（毫秒）视为停止交易
+STALE_AFTER_MS = 3600 * 1000
+
+# 各周期24小时对应的K线数量
+LOOKBACK_24H = {tf: 1440 // minutes for tf, minutes in TIMEFRAME_MINUTES.items()}
+
+# 多周期涨跌幅统计的周期
+MULTI_TIMEFRAMES = ('5m', '15m', '1h', '4h')
+
+# 评分筛选阈值
+MIN_BETA_SCORE = 30
+MIN_TOTAL_SCORE = 40
+BETA_SCORE_PER_PCT = 10  # 每1%的24h比价变化对应的 beta 分数
+# ticker 的24h窗口与K线回溯窗口不完全一致，按 ticker 涨跌幅预判 beta 时放宽的百分点
+BETA_PRECHECK_MARGIN_PCT = 1.0
+
+
+def compute_scores(
+    btc_ratio_change: np.ndarray,
+    eth_ratio_change: np.ndarray,
+    volume_24h: np.ndarray,
+    volume_surge: np.ndarray,
+    technical_score: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate beta, volume and total scores (0-100) for all coins in one vectorized pass
+
+    - Beta: average BTC/ETH ratio change, 5% = 50, 10% = 100
+    - Volume: tiered by 24h volume (1M/2M/5M/10M+), +20 for a volume surge
+    - Total: beta * 0.3 + volume * 0.2 + technical * 0.5
+
+    Returns:
+        (beta_score, volume_score, total_score) arrays
+    """
+    avg_ratio_change = (btc_ratio_change + eth_ratio_change) / 2
+    beta_score = np.clip(avg_ratio_change * BETA_SCORE_PER_PCT, 0, 100)
+
+    base_score = np.select(
+        [volume_24h >= 10000000, volume_24h >= 5000000, volume_24h >= 2000000, volume_24h >= 1000000],
+        [100, 80, 60, 40],
+        default=20
+    )
+    volume_score = np.where(volume_surge, np.minimum(100, base_score + 20), base_score)
+
+    total_score = (
+        beta_score * 0.3 +
+        volume_score * 0.2 +
+        technical_score * 0.5
+    )
+    return beta_score, volume_score, total_score
+
 
 class ScreeningService:
     """Service for screening altcoins based on various criteria"""
 
-    def __init__(self, db: Session):
+    # SQLite 只允许一个写入者：所有筛选实例的写操作通过此锁串行化
+    _write_lock = threading.Lock()
+    # 指标摘要缓存（LRU）：K线内容未变时（如多个任务在同一根K线内重复筛选）直接复用
+    _indicator_cache: 'OrderedDict[tuple, IndicatorResult]' = OrderedDict()
+    _indicator_cache_lock = threading.Lock()
+
+    def __init__(self, db: Session, binance: BinanceService = None):
         self.db = db
-        self.binance = BinanceService()
+        self.binance = binance or BinanceService()
         self.indicator_service = IndicatorService()
+        # 本轮筛选待写入的K线 (symbol, records)，在结束时与筛选结果一起提交
+        self._pending_klines: List[Tuple[str, List[Dict]]] = []
 
     def screen_altcoins(
         self,
         timeframe: str = '5m',
         min_volume: float = None,
-        min_price_change: float = None
+        min_price_change: float = None,
+        min_score: float = None
     ) -> List[Dict]:
         """
         Screen altcoins based on multiple criteria
@@ -40,6 +137,8 @@ class ScreeningService:
             timeframe: Timeframe to analyze (5m, 15m, 1h, 4h)
             min_volume: Minimum 24h volume in USD
             min_price_change: Minimum price change percentage
+            min_score: Only return results with total_score >= min_score
+                (all results are still saved to the database)
 
         Returns:
             List of screening results
@@ -72,57 +171,110 @@ class ScreeningService:
         logger.info(f"Pre-filtering by volume (min: ${min_volume:,.0f})...")
         altcoins, cached_tickers = self._prefilter_by_volume(all_altcoins, min_volume)
         logger.info(f"After pre-filter: {len(altcoins)} altcoins (cached {len(cached_tickers)} tickers)")
-        logger.info(f"Screening {len(altcoins)} altcoins with {MAX_WORKERS} parallel workers...")
+
+        # 24h 比价变化等于币种自身的24h涨跌幅（当前 BTC/ETH 价格在比值中约去），
+        # 先用 ticker 涨跌幅排除 beta 分数必然不足的币种，不再为其获取K线和计算指标
+        min_change_pct = MIN_BETA_SCORE / BETA_SCORE_PER_PCT - BETA_PRECHECK_MARGIN_PCT
+        altcoins = [
+            symbol for symbol in altcoins
+            if (cached_tickers[symbol].get('percentage') or 0) >= min_change_pct
+        ]
+        logger.info(f"After beta pre-check (24h change >= {min_change_pct:.1f}%): {len(altcoins)} altcoins")
+        logger.info(f"Screening {len(altcoins)} altcoins...")
 
         start_time = time.time()
-        results = []
+        candidates = []
         completed_count = 0
         error_count = 0
 
-        # 使用线程池并行处理
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            # 提交所有任务，传入缓存的ticker数据避免重复API调用
-            future_to_symbol = {
-                executor.submit(
-                    self._screen_single_coin,
+        # 每轮只做一次除法，逐币种计算比价时改用乘法
+        inv_btc = 1.0 / btc_price
+        inv_eth = 1.0 / eth_price
+        # 本轮所有结果共用同一时间戳
+        now = datetime.utcnow()
+
+        # 网络阶段：在一个事件循环中并发获取所有币种的K线
+        jobs = [(symbol, timeframe, 500) for symbol in altcoins]
+        candles = self.binance.fetch_ohlcv_multi(jobs, timeout=SCREENING_TIMEOUT)
+        logger.info(f"Fetched {len(candles)}/{len(jobs)} K-line series in {time.time() - start_time:.1f}s")
+
+        # 计算阶段：逐个币种计算指标和评分，不再发起K线请求
+        for symbol in altcoins:
+            try:
+                df = candles.get((symbol, timeframe))
+                if df is None:
+                    raise TimeoutError("K-line request did not finish in time")
+                result = self._screen_single_coin(
                     symbol=symbol,
                     timeframe=timeframe,
-                    btc_price=btc_price,
-                    eth_price=eth_price,
+                    inv_btc=inv_btc,
+                    inv_eth=inv_eth,
                     min_volume=min_volume,
                     min_price_change=min_price_change,
-                    save_klines=False,  # 并行时不保存K线，避免SQLite并发写入问题
-                    cached_ticker=cached_tickers.get(symbol)  # 复用预筛选的ticker数据
-                ): symbol
-                for symbol in altcoins
-            }
-
-            # 收集结果
-            for future in as_completed(future_to_symbol, timeout=SCREENING_TIMEOUT):
-                symbol = future_to_symbol[future]
-                try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
-                    completed_count += 1
-                except Exception as e:
-                    error_count += 1
-                    # 只记录少量错误，避免日志过多
-                    if error_count <= 5:
-                        logger.warning(f"Error screening {symbol}: {e}")
-                    elif error_count == 6:
-                        logger.warning(f"... and more errors (suppressed)")
+                    save_klines=True,
+                    cached_ticker=cached_tickers.get(symbol),  # 复用预筛选的ticker数据
+                    df=df,
+                    now=now
+                )
+                if result:
+                    candidates.append(result)
+                completed_count += 1
+            except Exception as e:
+                error_count += 1
+                # 只记录少量错误，避免日志过多
+                if error_count <= 5:
+                    logger.warning(f"Error screening {symbol}: {e}")
+                elif error_count == 6:
+                    logger.warning(f"... and more errors (suppressed)")
+
+        results = self._score_candidates(candidates)
+
+        # 多周期涨跌幅只用于展示，仅为通过筛选的币种计算
+        self._fill_multi_timeframe_changes(results, candles, timeframe)
 
         elapsed = time.time() - start_time
         logger.info(f"Screening completed: {completed_count} coins in {elapsed:.1f}s ({len(results)} passed filters)")
         if error_count > 0:
             logger.warning(f"  Errors: {error_count} coins failed")
 
-        # Sort by total score
-        results = sorted(results, key=lambda x: x['total_score'], reverse=True)
+        # Save K-lines and results in one transaction (serialized by _write_lock, single writer for SQLite)
+        kline_batches, self._pending_klines = self._pending_klines, []
+        self._persist_run(kline_batches, results, timeframe)
+
+        if min_score is not None:
+            # results are sorted by score (descending): cut at the threshold instead of testing every row
+            cutoff = bisect.bisect_right(results, -min_score, key=lambda r: -r['total_score'])
+            results = results[:cutoff]
+
+        return results
+
+    @staticmethod
+    def _score_candidates(candidates: List[Dict]) -> List[Dict]:
+        """Score all candidates at once; keep coins with positive beta and decent score, best first"""
+        if not candidates:
+            return []
+
+        beta_scores, volume_scores, total_scores = compute_scores(
+            np.array([c['btc_ratio_change_pct'] for c in candidates]),
+            np.array([c['eth_ratio_change_pct'] for c in candidates]),
+            np.array([c['volume_24h'] for c in candidates]),
+            np.array([c['volume_surge'] for c in candidates]),
+            np.array([c['technical_score'] for c in candidates])
+        )
+
+        # Filter: only return coins with positive beta and decent score
+        passed = np.flatnonzero(~((beta_scores < MIN_BETA_SCORE) | (total_scores < MIN_TOTAL_SCORE)))
+
+        # Sort by total score (descending); stable so ties keep screening order
+        order = passed[np.argsort(-total_scores[passed], kind='stable')]
 
-        # Save to database
-        self._save_screening_results(results, timeframe)
+        results = []
+        for i in order:
+            candidate = candidates[i]
+            candidate['beta_score'] = float(beta_scores[i])
+            candidate['volume_score'] = float(volume_scores[i])
+            candidate['total_score'] = float(total_scores[i])
+            results.append(candidate)
 
         return results
 
@@ -130,24 +282,34 @@ class ScreeningService:
         self,
         symbol: str,
         timeframe: str,
-        btc_price: float,
-        eth_price: float,
+        inv_btc: float,
+        inv_eth: float,
         min_volume: float,
         min_price_change: float,
         save_klines: bool = True,
-        cached_ticker: Dict = None
+        cached_ticker: Dict = None,
+        df: pd.DataFrame = None,
+        now: datetime = None
     ) -> Dict:
         """Screen a single coin
 
+        Returns the coin's metrics with beta/volume/total scores and multi-timeframe
+        price changes left at 0; scoring and the score filter run for all coins in
+        _score_candidates, price changes only for the coins that pass.
+
         Args:
-            save_klines: Whether to save kline data to DB. Set False for parallel execution.
-            cached_ticker: Pre-fetched ticker data to avoid duplicate API calls.
+            inv_btc: 1 / BTC price, precomputed once per screening run.
+            inv_eth: 1 / ETH price, precomputed once per screening run.
+            save_klines: Whether to save kline data to DB.
+            cached_ticker: Ticker from _prefilter_by_volume (required).
+            df: Pre-fetched candles of `timeframe`; fetched here when None.
+            now: Timestamp shared by all results of the run; current UTC time when None.
         """
 
-        # Use cached ticker or fetch new one
-        ticker = cached_ticker if cached_ticker else self.binance.fetch_ticker(symbol)
+        # 预筛选保证每个待筛选币种都有ticker，不再逐个请求
+        ticker = cached_ticker
         if not ticker:
-            return None
+            raise ValueError(f"No prefiltered ticker for {symbol}")
 
         volume_24h = ticker.get('quoteVolume', 0)
 
@@ -156,54 +318,45 @@ class ScreeningService:
             return None
 
         # Fetch OHLCV data
-        df = self.binance.fetch_ohlcv_smart(symbol, timeframe, limit=500)
+        if df is None:
+            df = self.binance.fetch_ohlcv_smart(symbol, timeframe, limit=500)
         if df.empty:
             return None
 
         # 检查数据是否是最新的（最后一根K线应该在1小时内）
-        from datetime import datetime, timedelta
-        latest_timestamp = df['timestamp'].iloc[-1]
-        if isinstance(latest_timestamp, str):
-            latest_timestamp = datetime.fromisoformat(latest_timestamp.replace('Z', '+00:00'))
+        # timestamp 列统一为无时区的 UTC datetime64[ns]，直接按毫秒整数比较
+        latest_ms = int(df['timestamp'].to_numpy()[-1].astype(np.int64)) // 1_000_000
 
         # 如果最新数据超过1小时，说明该币种可能已下架或停止交易
-        time_diff = datetime.utcnow() - latest_timestamp.replace(tzinfo=None)
-        if time_diff > timedelta(hours=1):
-            logger.debug(f"Skipping {symbol}: latest data {latest_timestamp} is over 1 hour old")
+        if time.time() * 1000 - latest_ms > STALE_AFTER_MS:
+            logger.debug(f"Skipping {symbol}: latest data {df['timestamp'].iloc[-1]} is over 1 hour old")
             return None
 
         # Save K-line data to database (skip during parallel execution)
         if save_klines:
             self._save_kline_data(df, symbol, timeframe)
 
-        # Calculate technical indicators
-        df = self.indicator_service.calculate_all_indicators(df)
+        # 取出 numpy 数组，后续标量读取不再经过 pandas 索引
+        closes = df['close'].to_numpy()
+
+        # Calculate technical indicators (only the latest values are used)
+        indicators = self._summarize_indicators(symbol, timeframe, df, latest_ms)
 
         # Get current price
-        current_price = df['close'].iloc[-1]
+        current_price = indicators.close_last
 
         # Calculate price ratios
-        price_btc_ratio = current_price / btc_price
-        price_eth_ratio = current_price / eth_price
+        price_btc_ratio = current_price * inv_btc
+        price_eth_ratio = current_price * inv_eth
 
         # Calculate ratio changes (compare to 24h ago)
         # Determine lookback period based on timeframe (24 hours = 1440 minutes)
-        timeframe_minutes = {
-            '1m': 1,
-            '5m': 5,
-            '15m': 15,
-            '30m': 30,
-            '1h': 60,
-            '4h': 240,
-            '1d': 1440,
-        }
-        minutes = timeframe_minutes.get(timeframe, 5)  # Default to 5m
-        lookback_24h = int(1440 / minutes)  # Number of candles in 24 hours
+        lookback_24h = LOOKBACK_24H.get(timeframe, LOOKBACK_24H['5m'])  # Default to 5m
 
-        if len(df) >= lookback_24h:
-            old_price = df['close'].iloc[-lookback_24h]
-            btc_ratio_old = old_price / btc_price
-            eth_ratio_old = old_price / eth_price
+        if len(closes) >= lookback_24h:
+            old_price = closes[-lookback_24h]
+            btc_ratio_old = old_price * inv_btc
+            eth_ratio_old = old_price * inv_eth
 
             btc_ratio_change = ((price_btc_ratio - btc_ratio_old) / btc_ratio_old) * 100
             eth_ratio_change = ((price_eth_ratio - eth_ratio_old) / eth_ratio_old) * 100
@@ -211,156 +364,182 @@ class ScreeningService:
             btc_ratio_change = 0
             eth_ratio_change = 0
 
-        # Calculate price changes for different timeframes
-        price_changes = self._calculate_multi_timeframe_changes(symbol)
-
-        # Check conditions
-        above_sma = self.indicator_service.check_price_above_sma(df)
-        macd_golden_cross = self.indicator_service.check_macd_golden_cross(df)
-        above_all_ema = self.indicator_service.check_price_above_all_ema(df)
-
-        # Check volume surge
-        volume_surge = df['volume_surge'].iloc[-1] if 'volume_surge' in df.columns else False
-
         # Detect price anomaly
-        price_anomaly, _ = self.indicator_service.detect_price_anomaly(
-            df, threshold=min_price_change
-        )
-
-        # Calculate scores
-        beta_score = self._calculate_beta_score(btc_ratio_change, eth_ratio_change)
-        volume_score = self._calculate_volume_score(volume_24h, volume_surge)
-        technical_score = self.indicator_service.calculate_technical_score(df)
-
-        # Calculate total score (weighted average)
-        total_score = (
-            beta_score * 0.3 +
-            volume_score * 0.2 +
-            technical_score * 0.5
-        )
-
-        # Filter: only return coins with positive beta and decent score
-        if beta_score < 30 or total_score < 40:
-            return None
+        price_anomaly = self.indicator_service.detect_price_anomaly_scalar(closes, threshold=min_price_change)
 
         return {
             'symbol': symbol,
-            'timestamp': datetime.utcnow(),
+            'timestamp': now or datetime.utcnow(),
             'timeframe': timeframe,
             'current_price': float(current_price),
             'price_btc_ratio': float(price_btc_ratio),
             'price_eth_ratio': float(price_eth_ratio),
             'btc_ratio_change_pct': float(btc_ratio_change),
             'eth_ratio_change_pct': float(eth_ratio_change),
-            'beta_score': float(beta_score),
-            'volume_score': float(volume_score),
-            'technical_score': float(technical_score),
-            'total_score': float(total_score),
-            'above_sma': bool(above_sma),
-            'macd_golden_cross': bool(macd_golden_cross),
-            'above_all_ema': bool(above_all_ema),
-            'volume_surge': bool(volume_surge),
+            'beta_score': 0.0,
+            'volume_score': 0.0,
+            'technical_score': float(indicators.technical_score),
+            'total_score': 0.0,
+            'above_sma': indicators.above_sma,
+            'macd_golden_cross': indicators.macd_golden,
+            'above_all_ema': indicators.above_all_ema,
+            'volume_surge': indicators.volume_surge_last,
             'price_anomaly': bool(price_anomaly),
-            'price_change_5m': float(price_changes.get('5m', 0)),
-            'price_change_15m': float(price_changes.get('15m', 0)),
-            'price_change_1h': float(price_changes.get('1h', 0)),
-            'price_change_4h': float(price_changes.get('4h', 0)),
+            'price_change_5m': 0.0,
+            'price_change_15m': 0.0,
+            'price_change_1h': 0.0,
+            'price_change_4h': 0.0,
             'volume_24h': float(volume_24h),
             'volume_change_pct': float(ticker.get('percentage', 0) or 0),
         }
 
+    def _summarize_indicators(
+        self,
+        symbol: str,
+        timeframe: str,
+        df: pd.DataFrame,
+        latest_ms: int
+    ) -> IndicatorResult:
+        """
+        Latest indicator values for df, reusing the result for identical K-lines
+
+        Earlier candles are closed and immutable, so the series is identified by its
+        length, last timestamp and the still-forming last candle's close and volume.
+        """
+        key = (
+            symbol, timeframe, len(df), latest_ms,
+            float(df['close'].to_numpy()[-1]), float(df['volume'].to_numpy()[-1])
+        )
+        cache = ScreeningService._indicator_cache
+        with ScreeningService._indicator_cache_lock:
+            cached = cache.get(key)
+            if cached is not None:
+                cache.move_to_end(key)
+                return cached
+
+        result = self.indicator_service.summarize_last(
+            self.indicator_service.calculate_all_indicators(df, min_rows=INDICATOR_WARMUP_ROWS)
+        )
+
+        with ScreeningService._indicator_cache_lock:
+            cache[key] = result
+            if len(cache) > INDICATOR_CACHE_SIZE:
+                cache.popitem(last=False)
+        return result
+
     def _prefilter_by_volume(self, symbols: List[str], min_volume: float) -> Tuple[List[str], Dict]:
         """
         Pre-filter symbols by 24h volume to speed up screening
-        Uses batch ticker API for efficiency
+        Uses one raw 24hr ticker request and a vectorized pandas filter
 
         Returns:
-            Tuple of (filtered_symbols, tickers_dict) - tickers can be reused by screening
+            Tuple of (filtered_symbols, tickers_dict) - every filtered symbol has a ticker,
+            reused by screening; both are empty if the tickers cannot be fetched
         """
         try:
-            # Fetch all tickers at once
-            tickers = self.binance.public_exchange.fetch_tickers(symbols)
-
-            # Filter by volume
-            filtered = []
-            for symbol in symbols:
-                if symbol in tickers:
-                    ticker = tickers[symbol]
-                    volume_usd = ticker.get('quoteVolume', 0)
-                    if volume_usd >= min_volume:
-                        filtered.append(symbol)
+            # One request for all 24h tickers, filtered in a single vectorized pass
+            df = self.binance.fetch_all_tickers_raw()
+            ids = self.binance.market_ids(symbols)
+            df = df[df['symbol'].isin(set(ids.values()))]
+            df = df[df['quoteVolume'] >= min_volume]
+
+            # Map exchange ids back to unified symbols, keeping the original symbol order
+            id_to_symbol = {market_id: symbol for symbol, market_id in ids.items()}
+            df = df.assign(symbol=df['symbol'].map(id_to_symbol)).set_index('symbol')
+            df = df.rename(columns={'lastPrice': 'last', 'priceChangePercent': 'percentage'})
+
+            tickers = df.to_dict('index')
+            filtered = [symbol for symbol in symbols if symbol in tickers]
 
             return filtered, tickers
         except Exception as e:
-            logger.error(f"Error in pre-filter: {e}, using all symbols")
-            return symbols, {}
+            logger.error(f"Error in pre-filter: {e}, skipping this screening run")
+            return [], {}
 
-    def _calculate_beta_score(
+    def _fill_multi_timeframe_changes(
         self,
-        btc_ratio_change: float,
-        eth_ratio_change: float
-    ) -> float:
+        results: List[Dict],
+        candles: Dict[Tuple[str, str], pd.DataFrame],
+        timeframe: str
+    ):
         """
-        Calculate beta score (0-100)
+        Fill price_change_* for all passing coins in one post-pass
 
-        Higher score = stronger performance relative to BTC/ETH
+        K-lines for timeframes that cannot be derived from the screening candles
+        are fetched for every coin at once in a single concurrent batch.
         """
-        # Average of BTC and ETH ratio changes
-        avg_ratio_change = (btc_ratio_change + eth_ratio_change) / 2
-
-        # Convert to score (0-100)
-        # Assuming ratio change of 5% = score of 50, 10% = 100
-        score = min(100, max(0, avg_ratio_change * 10))
-
-        return score
+        extra_timeframes = self._fetched_timeframes(timeframe)
+        extra = {}
+        if results and extra_timeframes:
+            extra = self.binance.fetch_ohlcv_multi(
+                [(r['symbol'], tf, 2) for r in results for tf in extra_timeframes],
+                timeout=SCREENING_TIMEOUT
+            )
+
+        for result in results:
+            symbol = result['symbol']
+            price_changes = self._calculate_multi_timeframe_changes(
+                symbol,
+                candles[(symbol, timeframe)],
+                timeframe,
+                # 超时未取到的周期记为空，不再逐个同步请求
+                {tf: extra.get((symbol, tf), pd.DataFrame()) for tf in extra_timeframes}
+            )
+            for tf in MULTI_TIMEFRAMES:
+                result[f'price_change_{tf}'] = float(price_changes.get(tf, 0))
 
-    def _calculate_volume_score(
+    @staticmethod
+    def _fetched_timeframes(timeframe: str) -> List[str]:
+        """Multi-timeframe periods that cannot be derived from `timeframe` candles"""
+        base_minutes = TIMEFRAME_MINUTES.get(timeframe)
+        return [
+            tf for tf in MULTI_TIMEFRAMES
+            if not base_minutes or TIMEFRAME_MINUTES[tf] % base_minutes
+        ]
+
+    def _calculate_multi_timeframe_changes(
         self,
-        volume_24h: float,
-        volume_surge: bool
-    ) -> float:
-        """
-        Calculate volume score (0-100)
+        symbol: str,
+        df: pd.DataFrame = None,
+        timeframe: str = None,
+        extra_candles: Dict[str, pd.DataFrame] = None
+    ) -> Dict[str, float]:
+        """Calculate price changes across multiple timeframes
 
-        Considers both absolute volume and volume surge
+        Args:
+            df: Already fetched candles of `timeframe`. Changes for timeframes that
+                are a multiple of it are derived from these closes instead of
+                fetching that timeframe again (e.g. from 5m: 15m = 3 candles back).
+            extra_candles: Already fetched candles for the other timeframes, by timeframe.
         """
-        # Base score from volume
-        if volume_24h >= 10000000:  # 10M+
-            base_score = 100
-        elif volume_24h >= 5000000:  # 5M+
-            base_score = 80
-        elif volume_24h >= 2000000:  # 2M+
-            base_score = 60
-        elif volume_24h >= 1000000:  # 1M+
-            base_score = 40
-        else:
-            base_score = 20
-
-        # Bonus for volume surge
-        if volume_surge:
-            base_score = min(100, base_score + 20)
-
-        return base_score
-
-    def _calculate_multi_timeframe_changes(self, symbol: str) -> Dict[str, float]:
-        """Calculate price changes across multiple timeframes"""
         changes = {}
-
-        timeframes = {
-            '5m': 1,  # 1 candle back
-            '15m': 1,
-            '1h': 1,
-            '4h': 1,
-        }
-
+        extra_candles = extra_candles or {}
+
+        timeframes = {tf: 1 for tf in MULTI_TIMEFRAMES}  # 1 candle back
+
+        base_minutes = TIMEFRAME_MINUTES.get(timeframe) if df is not None else None
+        if base_minutes:
+            closes = df['close'].to_numpy()
+            for tf in list(timeframes):
+                tf_minutes = TIMEFRAME_MINUTES[tf]
+                if tf_minutes % base_minutes:
+                    continue
+                steps = tf_minutes // base_minutes
+                if len(closes) > steps:
+                    previous = closes[-steps - 1]
+                    changes[tf] = ((closes[-1] - previous) / previous) * 100
+                    del timeframes[tf]
+
+        # 只为无法从已有K线推导的周期发起请求
         for tf, lookback in timeframes.items():
             try:
-                df = self.binance.fetch_ohlcv_smart(symbol, tf, limit=lookback + 1)
-                if not df.empty and len(df) > lookback:
-                    current = df['close'].iloc[-1]
-                    previous = df['close'].iloc[-lookback - 1]
-                    change = ((current - previous) / previous) * 100
-                    changes[tf] = change
+                df = extra_candles.get(tf)
+                if df is None:
+                    df = self.binance.fetch_ohlcv_smart(symbol, tf, limit=lookback + 1)
+                tf_closes = df['close'].to_numpy() if not df.empty else np.empty(0)
+                if tf_closes.size > lookback:
+                    previous = tf_closes[-lookback - 1]
+                    changes[tf] = ((tf_closes[-1] - previous) / previous) * 100
                 else:
                     changes[tf] = 0
             except:
@@ -368,8 +547,20 @@ class ScreeningService:
 
         return changes
 
+    def _persist_run(self, kline_batches: List[Tuple[str, List[Dict]]], results: List[Dict], timeframe: str):
+        """Write a screening run's K-lines and results in one transaction (single commit)"""
+        with ScreeningService._write_lock:
+            try:
+                for symbol, records in kline_batches:
+                    self._insert_kline_records(records, symbol)
+                self._save_screening_results(results, timeframe)
+                self.db.commit()
+            except Exception as e:
+                logger.error(f"Error committing screening run: {e}")
+                self.db.rollback()
+
     def _save_screening_results(self, results: List[Dict], timeframe: str):
-        """Save screening results to database using atomic batch operation"""
+        """Replace the screening results of this window (runs inside the run transaction)"""
         if not results:
             return
 
@@ -379,84 +570,61 @@ class ScreeningService:
             current_time = results[0]['timestamp']
             time_window_start = current_time - timedelta(minutes=5)
 
-            # 准备批量插入的对象列表
-            screening_objects = [
-                ScreeningResult(
-                    symbol=result['symbol'],
-                    timestamp=result['timestamp'],
-                    timeframe=timeframe,
-                    price_btc_ratio=result['price_btc_ratio'],
-                    price_eth_ratio=result['price_eth_ratio'],
-                    btc_ratio_change_pct=result['btc_ratio_change_pct'],
-                    eth_ratio_change_pct=result['eth_ratio_change_pct'],
-                    beta_score=result['beta_score'],
-                    volume_score=result['volume_score'],
-                    technical_score=result['technical_score'],
-                    total_score=result['total_score'],
-                    above_sma=result['above_sma'],
-                    macd_golden_cross=result['macd_golden_cross'],
-                    above_all_ema=result['above_all_ema'],
-                    volume_surge=result['volume_surge'],
-                    price_anomaly=result['price_anomaly'],
-                    price_change_5m=result['price_change_5m'],
-                    price_change_15m=result['price_change_15m'],
-                    price_change_1h=result['price_change_1h'],
-                    price_change_4h=result['price_change_4h'],
-                    volume_24h=result['volume_24h'],
-                    volume_change_pct=result['volume_change_pct'],
-                    current_price=result['current_price'],
-                )
+            # 只保留表中存在的列，按字典批量插入（不经过ORM对象和变更跟踪）
+            rows = [
+                {key: value for key, value in result.items() if key in SCREENING_RESULT_COLUMNS}
                 for result in results
             ]
+            for row in rows:
+                row['timeframe'] = timeframe
+
+            # 删除旧记录 + 批量插入新记录（SAVEPOINT 内，失败时不影响已写入的K线）
+            with self.db.begin_nested():
+                deleted_count = self.db.execute(
+                    delete(ScreeningResult).where(
+                        ScreeningResult.timestamp >= time_window_start,
+                        ScreeningResult.timestamp <= current_time,
+                        ScreeningResult.timeframe == timeframe
+                    )
+                ).rowcount
 
-            # 原子操作：删除旧记录 + 批量插入新记录
-            # 使用 synchronize_session='fetch' 确保会话状态同步
-            deleted_count = self.db.query(ScreeningResult).filter(
-                ScreeningResult.timestamp >= time_window_start,
-                ScreeningResult.timestamp <= current_time,
-                ScreeningResult.timeframe == timeframe
-            ).delete(synchronize_session='fetch')
-
-            # 批量添加所有对象
-            self.db.add_all(screening_objects)
-            self.db.commit()
+                # executemany 批量插入
+                self.db.execute(insert(ScreeningResult), rows)
 
             if deleted_count > 0:
                 logger.debug(f"DB: Replaced {deleted_count} old records with {len(results)} new records")
 
         except Exception as e:
             logger.error(f"Error saving screening results: {e}")
-            self.db.rollback()
 
     def _save_kline_data(self, df: pd.DataFrame, symbol: str, timeframe: str):
-        """Save K-line data to database"""
+        """Buffer K-line data until the end of the run (existing candles are skipped by the unique index)"""
+        # 在调用线程中复制记录，之后计算指标时会原地修改 df
+        # 每列一次性转换为 Python 列表，再按行拼装（不经过逐行的 pandas 装箱）
+        columns = [df[col].tolist() for col in KLINE_COLUMNS]
+        records = [
+            dict(zip(KLINE_COLUMNS, values), symbol=symbol, timeframe=timeframe)
+            for values in zip(*columns)
+        ]
+        if records:
+            self._pending_klines.append((symbol, records))
+
+    def _insert_kline_records(self, records: List[Dict], symbol: str):
+        """Insert one symbol's K-line records (runs inside the run transaction)"""
         try:
-            for _, row in df.iterrows():
-                # Check if record already exists
-                existing = self.db.query(KlineData).filter(
-                    KlineData.symbol == symbol,
-                    KlineData.timeframe == timeframe,
-                    KlineData.timestamp == row['timestamp']
-                ).first()
-
-                if not existing:
-                    kline = KlineData(
-                        symbol=symbol,
-                        timeframe=timeframe,
-                        timestamp=row['timestamp'],
-                        open=float(row['open']),
-                        high=float(row['high']),
-                        low=float(row['low']),
-                        close=float(row['close']),
-                        volume=float(row['volume']),
-                        quote_volume=float(row['quote_volume'])
+            insert_fn = pg_insert if self.db.get_bind().dialect.name == 'postgresql' else sqlite_insert
+            # 每个币种一个 SAVEPOINT：单个币种写入失败只回滚它自己
+            with self.db.begin_nested():
+                # 多行 VALUES 分批插入：每批一条语句，而不是每行一次执行
+                for start in range(0, len(records), KLINE_INSERT_CHUNK):
+                    stmt = insert_fn(KlineData).values(
+                        records[start:start + KLINE_INSERT_CHUNK]
+                    ).on_conflict_do_nothing(
+                        index_elements=['symbol', 'timeframe', 'timestamp']
                     )
-                    self.db.add(kline)
-
-            self.db.commit()
+                    self.db.execute(stmt)
         except Exception as e:
             logger.error(f"Error saving K-line data for {symbol}: {e}")
-            self.db.rollback()
 
     def get_top_opportunities(
         self,
@@ -465,31 +633,37 @@ class ScreeningService:
     ) -> List[Dict]:
         """Get top opportunities from latest screening"""
         try:
-            results = self.db.query(ScreeningResult).filter(
+            # 去重：每个symbol只保留最新的一条记录（在SQL中用窗口函数完成）
+            # 只查询 _screening_result_to_dict 用到的列，不加载 extra_data(JSON) 等字段，也不构造ORM对象
+            ranked = select(
+                *(getattr(ScreeningResult, column) for column in TOP_OPPORTUNITY_COLUMNS),
+                func.row_number().over(
+                    partition_by=ScreeningResult.symbol,
+                    order_by=[ScreeningResult.timestamp.desc(), ScreeningResult.total_score.desc()]
+                ).label('rn')
+            ).where(
                 ScreeningResult.total_score >= min_score
-            ).order_by(
-                ScreeningResult.timestamp.desc(),
-                ScreeningResult.total_score.desc()
+            ).subquery()
+
+            unique_results = self.db.execute(
+                select(
+                    *(ranked.c[column] for column in TOP_OPPORTUNITY_COLUMNS)
+                ).where(
+                    ranked.c.rn == 1
+                ).order_by(
+                    ranked.c.timestamp.desc(),
+                    ranked.c.total_score.desc()
+                ).limit(limit)
             ).all()
 
-            # 去重：每个symbol只保留最新的一条记录
-            seen_symbols = set()
-            unique_results = []
-            for r in results:
-                if r.symbol not in seen_symbols:
-                    seen_symbols.add(r.symbol)
-                    unique_results.append(r)
-                    if len(unique_results) >= limit:
-                        break
-
             return [self._screening_result_to_dict(r) for r in unique_results]
         except Exception as e:
             logger.error(f"Error getting top opportunities: {e}")
             return []
 
     @staticmethod
-    def _screening_result_to_dict(result: ScreeningResult) -> Dict:
-        """Convert ScreeningResult object to dictionary"""
+    def _screening_result_to_dict(result) -> Dict:
+        """Convert a ScreeningResult object or row to dictionary"""
         return {
             'id': result.id,
             'symbol': result.symbol,
@@ -3,9 +3,12 @@ Simulated Trading Service
 模拟交易服务 - 高胜率短线策略
 """
 from datetime import datetime, timedelta
+import threading
+import time
+import numpy as np
 from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, case, func, or_
 
 from backend.database.models import (
     SimAccount, SimPosition, SimTrade, AutoTradingLog,
@@ -14,13 +17,58 @@ from backend.database.models import (
 from backend.services.binance_service import BinanceService
 from backend.services.indicator_service import IndicatorService
 
+# 短时价格缓存：symbol -> (获取时间, 价格)
+# 同一时刻多个账户/请求查询同一币种时共用一次请求；TTL 很短，不影响止损止盈的实时性
+PRICE_CACHE_TTL = 2.0
+_price_cache: Dict[str, Tuple[float, float]] = {}
+_price_cache_lock = threading.Lock()
+
+
+def _cached_price(symbol: str, max_age: float) -> Optional[float]:
+    """Return the cached price for symbol if younger than max_age seconds"""
+    with _price_cache_lock:
+        entry = _price_cache.get(symbol)
+    if entry and time.monotonic() - entry[0] < max_age:
+        return entry[1]
+    return None
+
+
+def _store_prices(prices: Dict[str, float]):
+    """Cache freshly fetched prices"""
+    now = time.monotonic()
+    with _price_cache_lock:
+        for symbol, price in prices.items():
+            _price_cache[symbol] = (now, price)
+
+# 持仓价值变化小于此值时不更新持仓字段
+POSITION_VALUE_EPSILON = 1e-8
+
+# 自动交易评估筛选结果时读取的列
+AUTO_TRADE_SCREENING_COLUMNS = (
+    ScreeningResult.symbol,
+    ScreeningResult.total_score,
+    ScreeningResult.technical_score,
+    ScreeningResult.beta_score,
+    ScreeningResult.volume_score,
+    ScreeningResult.current_price,
+    ScreeningResult.volume_24h,
+    ScreeningResult.price_change_5m,
+    ScreeningResult.price_change_15m,
+    ScreeningResult.price_change_1h,
+    ScreeningResult.macd_golden_cross,
+    ScreeningResult.above_all_ema,
+    ScreeningResult.above_sma,
+    ScreeningResult.volume_surge,
+    ScreeningResult.price_anomaly,
+)
+
 
 class SimTradingService:
     """Simulated trading service with auto-trading capabilities"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, binance: Optional[BinanceService] = None):
         self.db = db
-        self.binance = BinanceService()
+        self.binance = binance or BinanceService()
         self.commission_rate = 0.001  # 0.1% commission
 
     # ==================== Account Management ====================
@@ -46,10 +94,8 @@ class SimTradingService:
         return account
 
     def get_account(self, account_id: int) -> Optional[SimAccount]:
-        """Get account by ID"""
-        return self.db.query(SimAccount).filter(
-            SimAccount.id == account_id
-        ).first()
+        """Get account by ID (served from the session's identity map when already loaded)"""
+        return self.db.get(SimAccount, account_id)
 
     def get_all_accounts(self) -> List[SimAccount]:
         """Get all active accounts"""
@@ -57,14 +103,41 @@ class SimTradingService:
             SimAccount.is_active == True
         ).all()
 
-    def update_account_equity(self, account_id: int):
-        """Update account equity based on current positions"""
-        account = self.get_account(account_id)
+    def get_auto_trading_accounts(self) -> List[SimAccount]:
+        """Get active accounts with auto-trading enabled"""
+        return self.db.query(SimAccount).filter(
+            and_(
+                SimAccount.is_active == True,
+                SimAccount.auto_trading_enabled == True
+            )
+        ).all()
+
+    def update_account_equity(
+        self,
+        account_id: int,
+        prices: Dict[str, float] = None,
+        account: SimAccount = None,
+        positions: List[SimPosition] = None
+    ):
+        """
+        Update account equity based on current positions
+
+        Args:
+            account_id: Account ID
+            prices: Current prices by symbol; fetched in one batch when None
+            account: Already loaded account; loaded when None
+            positions: Already loaded open positions; queried when None
+        """
+        if account is None:
+            account = self.get_account(account_id)
         if not account:
             return
 
         # Get all open positions
-        positions = self.get_open_positions(account_id)
+        if positions is None:
+            positions = self.get_open_positions(account_id)
+        if prices is None:
+            prices = self._get_current_prices([p.symbol for p in positions])
 
         # Calculate total position value at current prices
         total_position_value = 0.0
@@ -72,18 +145,24 @@ class SimTradingService:
 
         for position in positions:
             # Update position current price
-            current_price = self._get_current_price(position.symbol)
+            current_price = prices.get(position.symbol)
             if current_price:
-                position.current_price = current_price
-                position.current_value = position.remaining_quantity * current_price
-                position.unrealized_pnl = position.current_value - (
-                    position.remaining_quantity * position.entry_price
-                )
-                position.unrealized_pnl_pct = (
-                    position.unrealized_pnl / (position.remaining_quantity * position.entry_price)
-                ) * 100 if position.entry_price > 0 else 0
+                current_value = position.remaining_quantity * current_price
+                # 价值未变化（如同一轮中平仓检查已按相同价格更新过）时不改写字段，避免无意义的 UPDATE
+                if (
+                    position.current_value is None
+                    or abs(current_value - position.current_value) >= POSITION_VALUE_EPSILON
+                ):
+                    position.current_price = current_price
+                    position.current_value = current_value
+                    position.unrealized_pnl = current_value - (
+                        position.remaining_quantity * position.entry_price
+                    )
+                    position.unrealized_pnl_pct = (
+                        position.unrealized_pnl / (position.remaining_quantity * position.entry_price)
+                    ) * 100 if position.entry_price > 0 else 0
 
-                total_position_value += position.current_value
+                total_position_value += current_value
                 frozen_balance += position.remaining_quantity * position.entry_price
 
         # Update account
@@ -116,25 +195,22 @@ class SimTradingService:
         if not account:
             return False, "Account not found", None
 
-        # Check if already have position for this symbol
-        existing = self.db.query(SimPosition).filter(
+        # 一条查询同时取得未平仓总数和该币种的未平仓数
+        open_positions_count, same_symbol_count = self.db.query(
+            func.count(SimPosition.id),
+            func.coalesce(func.sum(case((SimPosition.symbol == symbol, 1), else_=0)), 0)
+        ).filter(
             and_(
                 SimPosition.account_id == account_id,
-                SimPosition.symbol == symbol,
                 SimPosition.is_closed == False
             )
-        ).first()
+        ).one()
 
-        if existing:
+        # Check if already have position for this symbol
+        if same_symbol_count:
             return False, f"Already have open position for {symbol}", None
 
         # Check max positions
-        open_positions_count = self.db.query(SimPosition).filter(
-            and_(
-                SimPosition.account_id == account_id,
-                SimPosition.is_closed == False
-            )
-        ).count()
 
         if open_positions_count >= account.max_positions:
             return False, f"Max positions reached ({account.max_positions})", None
@@ -235,9 +311,7 @@ class SimTradingService:
         Returns:
             (success, message)
         """
-        position = self.db.query(SimPosition).filter(
-            SimPosition.id == position_id
-        ).first()
+        position = self.db.get(SimPosition, position_id)
 
         if not position or position.is_closed:
             return False, "Position not found or already closed"
@@ -252,6 +326,25 @@ class SimTradingService:
             if not close_price:
                 return False, "Failed to get current price"
 
+        msg = self._apply_close(position, account, close_price, close_reason, partial_pct)
+        self.db.commit()
+
+        return True, msg
+
+    def _apply_close(
+        self,
+        position: SimPosition,
+        account: SimAccount,
+        close_price: float,
+        close_reason: str,
+        partial_pct: float
+    ) -> str:
+        """
+        Apply a (partial) close to the loaded position and account without committing
+
+        Returns:
+            Result message
+        """
         # Calculate quantity to close
         close_quantity = position.remaining_quantity * (partial_pct / 100.0)
         close_value = close_quantity * close_price
@@ -288,17 +381,15 @@ class SimTradingService:
         # Update position
         position.remaining_quantity -= close_quantity
 
-        # Record partial exit
-        if not position.partial_exits:
-            position.partial_exits = []
-        position.partial_exits.append({
+        # Record partial exit（重新赋值列表，JSON 列的原地 append 不会被会话检测到）
+        position.partial_exits = (position.partial_exits or []) + [{
             'price': close_price,
             'quantity': close_quantity,
             'time': datetime.utcnow().isoformat(),
             'reason': close_reason,
             'pnl': pnl,
             'pnl_pct': pnl_pct
-        })
+        }]
 
         # If full close
         if position.remaining_quantity < 0.0001:  # Essentially zero
@@ -316,23 +407,56 @@ class SimTradingService:
         else:
             account.losing_trades += 1
 
-        self.db.commit()
-
-        return True, f"Position closed: {position.symbol} @ {close_price}, P&L: {pnl:.2f} ({pnl_pct:.2f}%)"
+        return f"Position closed: {position.symbol} @ {close_price}, P&L: {pnl:.2f} ({pnl_pct:.2f}%)"
 
-    def check_and_execute_exits(self, account_id: int) -> List[Dict]:
+    def check_and_execute_exits(
+        self,
+        account_id: int,
+        prices: Dict[str, float] = None,
+        positions: List[SimPosition] = None
+    ) -> List[Dict]:
         """
         Check all open positions for stop loss / take profit
         Returns list of executed exits
+
+        Args:
+            account_id: Account ID
+            prices: Current prices by symbol; fetched in one batch when None
+            positions: Already loaded open positions; queried when None
         """
-        positions = self.get_open_positions(account_id)
+        if positions is None:
+            positions = self.get_open_positions(account_id)
+        if prices is None:
+            prices = self._get_current_prices([p.symbol for p in positions])
         exits = []
 
-        for position in positions:
-            # Get current price
-            current_price = self._get_current_price(position.symbol)
-            if not current_price:
-                continue
+        account = self.get_account(account_id)
+        if not account:
+            return exits
+
+        # 只处理取到价格的持仓
+        priced = [p for p in positions if prices.get(p.symbol)]
+        if not priced:
+            return exits
+
+        # 止损/止盈判断一次性向量化完成：止盈价按最多档数补 inf，未触发的档位永远不命中
+        current = np.array([prices[p.symbol] for p in priced], dtype=np.float64)
+        stop_loss = np.array(
+            [p.stop_loss_price if p.stop_loss_price is not None else -np.inf for p in priced],
+            dtype=np.float64
+        )
+        tp_lists = [p.take_profit_prices or [] for p in priced]
+        tp = np.full((len(priced), max(map(len, tp_lists), default=0)), np.inf)
+        for row, levels in enumerate(tp_lists):
+            tp[row, :len(levels)] = levels
+
+        sl_hit = current <= stop_loss
+        tp_hit = current[:, None] >= tp
+        tp_any = tp_hit.any(axis=1)
+        tp_first = tp_hit.argmax(axis=1)  # 第一个命中的止盈档位
+
+        for k, position in enumerate(priced):
+            current_price = prices[position.symbol]
 
             # Update position current price
             position.current_price = current_price
@@ -345,52 +469,40 @@ class SimTradingService:
             ) * 100 if position.entry_price > 0 else 0
 
             # Check stop loss
-            if current_price <= position.stop_loss_price:
-                success, msg = self.close_position(
-                    position.id,
-                    close_price=current_price,
-                    close_reason='STOP_LOSS',
-                    partial_pct=100.0
-                )
-                if success:
-                    exits.append({
-                        'symbol': position.symbol,
-                        'type': 'STOP_LOSS',
-                        'price': current_price,
-                        'message': msg
-                    })
+            if sl_hit[k]:
+                msg = self._apply_close(position, account, current_price, 'STOP_LOSS', 100.0)
+                exits.append({
+                    'symbol': position.symbol,
+                    'type': 'STOP_LOSS',
+                    'price': current_price,
+                    'message': msg
+                })
                 continue
 
             # Check take profit levels
-            tp_prices = position.take_profit_prices or []
-            for i, tp_price in enumerate(tp_prices):
-                if current_price >= tp_price:
-                    # Partial exit (33% each for 3 levels)
-                    partial_pct = 100.0 / len(tp_prices)
-
-                    success, msg = self.close_position(
-                        position.id,
-                        close_price=current_price,
-                        close_reason=f'TAKE_PROFIT_{i+1}',
-                        partial_pct=partial_pct
-                    )
+            if tp_any[k]:
+                i = int(tp_first[k])
+                tp_prices = tp_lists[k]
+                # Partial exit (33% each for 3 levels)
+                partial_pct = 100.0 / len(tp_prices)
+
+                msg = self._apply_close(
+                    position, account, current_price, f'TAKE_PROFIT_{i+1}', partial_pct
+                )
+                exits.append({
+                    'symbol': position.symbol,
+                    'type': f'TAKE_PROFIT_{i+1}',
+                    'price': current_price,
+                    'partial_pct': partial_pct,
+                    'message': msg
+                })
 
-                    if success:
-                        exits.append({
-                            'symbol': position.symbol,
-                            'type': f'TAKE_PROFIT_{i+1}',
-                            'price': current_price,
-                            'partial_pct': partial_pct,
-                            'message': msg
-                        })
-
-                        # Remove this TP level so we don't trigger it again
-                        position.take_profit_prices = [
-                            p for j, p in enumerate(tp_prices) if j != i
-                        ]
-                        self.db.commit()
-                        break
+                # Remove this TP level so we don't trigger it again
+                position.take_profit_prices = [
+                    p for j, p in enumerate(tp_prices) if j != i
+                ]
 
+        # 所有平仓和价格更新在一个事务中提交
         self.db.commit()
         return exits
 
@@ -499,7 +611,8 @@ class SimTradingService:
         time_threshold = datetime.utcnow() - timedelta(minutes=lookback_minutes)
 
         # Get latest screening results for the specific timeframe
-        screening_results = self.db.query(ScreeningResult).filter(
+        # 只查询入场评估和日志用到的列，不加载 extra_data(JSON) 等字段，也不构造ORM对象
+        screening_results = self.db.query(*AUTO_TRADE_SCREENING_COLUMNS).filter(
             and_(
                 ScreeningResult.timestamp >= time_threshold,
                 ScreeningResult.timeframe == entry_timeframe
@@ -515,15 +628,20 @@ class SimTradingService:
             'positions_closed': []
         }
 
+        # 持仓只查询一次，价格一次批量获取，平仓检查和权益更新共用
+        positions = self.get_open_positions(account_id)
+        prices = self._get_current_prices([p.symbol for p in positions])
+
         # First, check and execute exits on existing positions
-        exits = self.check_and_execute_exits(account_id)
+        exits = self.check_and_execute_exits(account_id, prices=prices, positions=positions)
         actions['positions_closed'] = exits
+        positions = [p for p in positions if not p.is_closed]
 
         # Update account equity
-        self.update_account_equity(account_id)
+        self.update_account_equity(account_id, prices=prices, account=account, positions=positions)
 
         # Check if we can open new positions
-        open_positions_count = len(self.get_open_positions(account_id))
+        open_positions_count = len(positions)
 
         if open_positions_count >= account.max_positions:
             self._log_auto_trading(
@@ -663,14 +781,51 @@ class SimTradingService:
 
     # ==================== Helper Methods ====================
 
-    def _get_current_price(self, symbol: str) -> Optional[float]:
-        """Get current market price for a symbol"""
+    def _get_current_price(self, symbol: str, max_age: float = PRICE_CACHE_TTL) -> Optional[float]:
+        """Get current market price for a symbol (reused if fetched within max_age seconds)"""
+        cached = _cached_price(symbol, max_age)
+        if cached is not None:
+            return cached
         try:
             ticker = self.binance.fetch_ticker(symbol)
-            return ticker.get('last', None) if ticker else None
+            price = ticker.get('last', None) if ticker else None
         except Exception as e:
             print(f"Error fetching price for {symbol}: {e}")
             return None
+        if price:
+            _store_prices({symbol: price})
+        return price
+
+    def _get_current_prices(self, symbols: List[str], max_age: float = PRICE_CACHE_TTL) -> Dict[str, float]:
+        """
+        Get current market prices for several symbols with one ticker request
+
+        Prices fetched within max_age seconds are reused; only the rest are requested.
+        """
+        prices = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            cached = _cached_price(symbol, max_age)
+            if cached is not None:
+                prices[symbol] = cached
+            else:
+                missing.append(symbol)
+        if not missing:
+            return prices
+
+        try:
+            tickers = self.binance.fetch_tickers(missing)
+            fetched = {
+                symbol: ticker['last']
+                for symbol, ticker in tickers.items()
+                if ticker and ticker.get('last')
+            }
+        except Exception as e:
+            print(f"Error fetching prices for {len(missing)} symbols: {e}")
+            return prices
+        _store_prices(fetched)
+        prices.update(fetched)
+        return prices
 
     def _get_symbol_atr(self, symbol: str, timeframe: str = '15m') -> Tuple[Optional[float], Optional[float]]:
         """
@@ -757,12 +912,9 @@ class SimTradingService:
         if not account:
             return {}
 
-        # Update equity first
-        self.update_account_equity(account_id)
-        self.db.refresh(account)
-
-        # Get positions
+        # Get positions, then update equity with them
         open_positions = self.get_open_positions(account_id)
+        self.update_account_equity(account_id, account=account, positions=open_positions)
 
         # Get recent trades
         recent_trades = self.db.query(SimTrade).filter(
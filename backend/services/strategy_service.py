@@ -12,7 +12,9 @@ Trading Strategy Module
 from typing import Dict, Tuple, List
 from dataclasses import dataclass
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
+
+BEIJING_TZ = ZoneInfo('Asia/Shanghai')
 
 
 @dataclass
@@ -45,7 +47,6 @@ class TradingStrategy:
     
     def __init__(self, config: StrategyConfig = None):
         self.config = config or StrategyConfig()
-        self.beijing_tz = pytz.timezone('Asia/Shanghai')
         
         # 优选交易时间段（北京时间）
         self.preferred_windows = [
@@ -56,7 +57,7 @@ class TradingStrategy:
     
     def is_in_preferred_window(self) -> bool:
         """检查当前是否在优选交易时段"""
-        now = datetime.now(self.beijing_tz)
+        now = datetime.now(BEIJING_TZ)
         current_minutes = now.hour * 60 + now.minute
         
         for start_h, start_m, end_h, end_m in self.preferred_windows:
@@ -5,6 +5,7 @@ from .logger import (
     get_monitor_logger,
     get_trading_logger,
     get_api_logger,
+    get_notification_logger,
     default_logger,
 )
 
@@ -14,5 +15,6 @@ __all__ = [
     'get_monitor_logger',
     'get_trading_logger',
     'get_api_logger',
+    'get_notification_logger',
     'default_logger',
 ]
@@ -89,5 +89,12 @@ def get_api_logger() -> logging.Logger:
     return setup_logger("tretra.api")
 
 
+def get_notification_logger() -> logging.Logger:
+    """Get logger for notification service (level from settings.LOG_LEVEL)"""
+    from backend.config import settings
+    level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+    return setup_logger("tretra.notification", level=level)
+
+
 # Default logger
 default_logger = setup_logger()